@@ -1,13 +1,21 @@
 #!/usr/bin/env python3
 import os
+import json
+import stat
 import wave
-import time
 import threading
+import functools
+from collections import OrderedDict
 
 import numpy as np
 import alsaaudio
+try:
+    import orjson
+except ImportError:
+    # optional: pip install orjson (faster JSON responses)
+    orjson = None
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 import uvicorn
 
@@ -21,6 +29,9 @@ AUDIO_FOLDER = os.getenv("AUDIO_FOLDER", "./audio_files/")
 TARGET_RATE = 44100
 CHUNK = 1024
 
+# Decoded/resampled WAVs kept in RAM so replayed cues skip decode + resample
+WAV_CACHE_BYTES = int(os.getenv("WAV_CACHE_MB", "128")) * 1024 * 1024
+
 # ==========================================================
 # SHARED STATE
 # ==========================================================
@@ -40,13 +51,24 @@ last_nonzero_volume: float = 1.0
 
 running = True
 state_lock = threading.Lock()
+bg_ready = threading.Event()  # set while a background buffer is loaded; the mixer idles on it
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
 
 
 SERVICE_NAME = "audio"
 
+@functools.lru_cache(maxsize=16)
+def _ok_body(action: str, message: str) -> bytes:
+    # same bytes JSONResponse would render for api_ok(action, message)
+    payload = {"ok": True, "service": SERVICE_NAME, "action": action, "message": message}
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
 def api_ok(action: str, message: str = "ok", **extra):
+    if not extra:
+        # fixed acknowledgements (stop, root): serialised once, not per request
+        return Response(content=_ok_body(action, message), media_type="application/json")
     payload = {"ok": True, "service": SERVICE_NAME, "action": action, "message": message}
     payload.update(extra)
     return payload
@@ -122,10 +144,48 @@ def resample_linear(data: np.ndarray, orig_rate: int, target_rate: int) -> np.nd
 # WAV LOADING
 # ==========================================================
 
+_wav_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_wav_cache_bytes = 0
+_wav_cache_lock = threading.Lock()
+
+
 def load_wav_any(path: str, require_stereo=False, require_mono=False):
-    if not os.path.isfile(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise FileNotFoundError(path)
+    if not stat.S_ISREG(st.st_mode):
         raise FileNotFoundError(path)
 
+    # keyed on mtime/size so an edited file is decoded again
+    key = (path, st.st_mtime_ns, st.st_size, bool(require_stereo), bool(require_mono))
+    with _wav_cache_lock:
+        hit = _wav_cache.get(key)
+        if hit is not None:
+            _wav_cache.move_to_end(key)
+            return hit
+
+    data = _decode_wav(path, require_stereo, require_mono)
+    data.setflags(write=False)  # shared between requests; the mixer only reads it
+    _wav_cache_put(key, data)
+    return data
+
+
+def _wav_cache_put(key: tuple, data: np.ndarray):
+    global _wav_cache_bytes
+    if data.nbytes > WAV_CACHE_BYTES:
+        return
+    with _wav_cache_lock:
+        if key in _wav_cache:
+            return
+        _wav_cache[key] = data
+        _wav_cache_bytes += data.nbytes
+        while _wav_cache_bytes > WAV_CACHE_BYTES:
+            _, old = _wav_cache.popitem(last=False)
+            _wav_cache_bytes -= old.nbytes
+
+
+def _decode_wav(path: str, require_stereo=False, require_mono=False):
     with wave.open(path, "rb") as w:
         rate = w.getframerate()
         channels = w.getnchannels()
@@ -198,7 +258,8 @@ def audio_thread():
             local_master_volume = master_volume
 
         if local_bg_buffer is None:
-            time.sleep(0.01)
+            # park until /set_background loads something instead of polling every 10 ms
+            bg_ready.wait(0.5)
             continue
 
         # -------- Background Loop -----------
@@ -285,7 +346,8 @@ def audio_thread():
 # ==========================================================
 
 def _clamp_vol(v: int) -> float:
-    return max(0, min(int(v), 100)) / 100.0
+    # v is already an int: the routes declare it and FastAPI parses/validates it
+    return max(0, min(v, 100)) / 100.0
 
 
 # ==========================================================
@@ -304,6 +366,7 @@ def set_background(file: str, vol: int):
         bg_buffer = new_buffer
         bg_pos = 0
         bg_volume = new_volume
+        bg_ready.set()
 
     return api_ok("set_background", "background updated", file=file, volume=int(new_volume * 100))
 
@@ -362,6 +425,7 @@ def stop_audio():
     with state_lock:
         bg_buffer = None
         bg_pos = 0
+        bg_ready.clear()
 
         interrupt_L = None
         interrupt_R = None
@@ -76,7 +76,7 @@ ensure_venv(){
     set -e
     source '$VENV_DIR/bin/activate'
     python -m pip install --upgrade pip wheel
-    python -m pip install fastapi 'uvicorn[standard]'
+    python -m pip install fastapi 'uvicorn[standard]' orjson
     # Do NOT pip-install pyalsaaudio: it often compiles and needs libasound2-dev.
     # We rely on apt packages (python3-alsaaudio, python3-numpy) exposed via --system-site-packages.
     python - <<'PY'
@@ -6,13 +6,28 @@ Hue Server (path-only, COGS-friendly)
 
 Notes
 - Names in URLs can use underscores "_" instead of spaces. The server converts "_" -> " ".
+- Name lookups are case-insensitive.
 - Uses Hue v1 local API. Press the bridge's LINK button before calling /hue/register/ip/{ip}.
 """
-import os, json, time
+import os, json, time, threading
+from operator import itemgetter
 from typing import Dict, Any, Optional
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    # optional: pip install orjson (faster hue_config.json load/save and responses)
+    orjson = None
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
 # ---------- Config ----------
@@ -21,7 +36,8 @@ CFG_PATH = os.environ.get("HUE_CONFIG", "/opt/hue-server/hue_config.json")
 REQUEST_TIMEOUT = float(os.environ.get("HUE_TIMEOUT", "3.0"))
 DEVICETYPE = "hue-server#pi"  # registration identifier
 
-app = FastAPI(title=APP_TITLE, version="1.1")
+app = FastAPI(title=APP_TITLE, version="1.1",
+              default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
 
 
 SERVICE_NAME = "hue"
@@ -91,50 +107,107 @@ def _ensure_cfg_dir():
     if d and not os.path.exists(d):
         os.makedirs(d, exist_ok=True)
 
+# Parsed config, re-read only when the file's mtime changes.
+# "nmap" is the lowercased, normalized name -> light_id index used by lookups.
+_CFG_LOCK = threading.Lock()
+_CFG_CACHE: Dict[str, Any] = {"mtime": None, "data": None, "nmap": {}}
+
+def _empty_cfg() -> Dict[str, Any]:
+    return {"bridge_ip": "", "username": "", "map": {}}
+
+def _name_index(m: Dict[str, Any]) -> Dict[str, str]:
+    return {_norm_name(k).lower(): str(v) for k, v in m.items()}
+
+def _copy_cfg(cfg: Dict[str, Any], nmap: Dict[str, str]) -> Dict[str, Any]:
+    # Callers mutate "map" in place before save_cfg(); never hand out the cached dict.
+    # "_nmap" is runtime-only and shared read-only; save_cfg() strips it.
+    out = dict(cfg)
+    out["map"] = dict(cfg.get("map") or {})
+    out["_nmap"] = nmap
+    return out
+
 def load_cfg() -> Dict[str, Any]:
-    if not os.path.exists(CFG_PATH):
-        return {"bridge_ip": "", "username": "", "map": {}}
-    with open(CFG_PATH, "r") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return {"bridge_ip": "", "username": "", "map": {}}
+    try:
+        mtime = os.stat(CFG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return _copy_cfg(_empty_cfg(), {})
+    with _CFG_LOCK:
+        if _CFG_CACHE["mtime"] != mtime:
+            with open(CFG_PATH, "rb") as f:
+                try:
+                    data = _json_loads(f.read())
+                except Exception:
+                    data = _empty_cfg()
+            _CFG_CACHE["data"] = data
+            _CFG_CACHE["nmap"] = _name_index(data.get("map") or {})
+            _CFG_CACHE["mtime"] = mtime
+        return _copy_cfg(_CFG_CACHE["data"], _CFG_CACHE["nmap"])
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    # Write to a sibling temp file and rename over the target so a power cut
+    # mid-write leaves either the old or the new file, never a truncated one.
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 def save_cfg(cfg: Dict[str, Any]):
     _ensure_cfg_dir()
-    with open(CFG_PATH, "w") as f:
-        json.dump(cfg, f, indent=2)
+    data = {k: v for k, v in cfg.items() if k != "_nmap"}
+    with _CFG_LOCK:
+        _write_atomic(CFG_PATH, _json_dumps(data))
+        _CFG_CACHE["data"] = data
+        _CFG_CACHE["nmap"] = _name_index(data.get("map") or {})
+        _CFG_CACHE["mtime"] = os.stat(CFG_PATH).st_mtime_ns
 
 def require_bridge(cfg: Dict[str, Any]):
     if not cfg.get("bridge_ip") or not cfg.get("username"):
         raise HTTPException(status_code=400, detail="Bridge not configured. Press bridge LINK button, then call /hue/register/ip/{ip}")
 
 # ---------- Hue local API helpers ----------
+# One keep-alive session for all bridge calls so cues reuse the TCP connection
+_SESSION = requests.Session()
+_SESSION.headers["Connection"] = "keep-alive"
+_SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=8,
+                                      max_retries=Retry(total=1, backoff_factor=0.05)))
+
 def hue_base(cfg) -> str:
     return f"http://{cfg['bridge_ip']}/api/{cfg['username']}"
 
 def hue_get(cfg, path: str):
-    r = requests.get(hue_base(cfg) + path, timeout=REQUEST_TIMEOUT)
+    r = _SESSION.get(hue_base(cfg) + path, timeout=REQUEST_TIMEOUT)
     r.raise_for_status()
     return r.json()
 
 def hue_put(cfg, path: str, body: Dict[str, Any]):
-    r = requests.put(hue_base(cfg) + path, json=body, timeout=REQUEST_TIMEOUT)
+    r = _SESSION.put(hue_base(cfg) + path, json=body, timeout=REQUEST_TIMEOUT)
     r.raise_for_status()
     return r.json()
 
 def hue_post_raw(ip: str, path: str, body: Dict[str, Any]):
-    r = requests.post(f"http://{ip}{path}", json=body, timeout=REQUEST_TIMEOUT)
+    r = _SESSION.post(f"http://{ip}{path}", json=body, timeout=REQUEST_TIMEOUT)
     r.raise_for_status()
     return r.json()
 
 # ---------- Name/mapping helpers ----------
+_UND_TABLE = str.maketrans("_", " ")
+
 def _norm_name(name: str) -> str:
-    return name.replace("_", " ").strip()
+    return name.translate(_UND_TABLE).strip()
+
+def _drop_mapping(m: Dict[str, Any], name_norm: str) -> bool:
+    # lookups are case-insensitive, so "Lamp", "lamp" and "LAMP" are one mapping
+    key = name_norm.lower()
+    stale = [k for k in m if _norm_name(k).lower() == key]
+    for k in stale:
+        del m[k]
+    return bool(stale)
 
 def _resolve_light_id_by_name(cfg, name: str) -> str:
     name_norm = _norm_name(name)
-    lid = cfg.get("map", {}).get(name_norm)
+    lid = cfg["_nmap"].get(name_norm.lower())  # prebuilt by load_cfg(), case-insensitive
     if not lid:
         raise HTTPException(status_code=404, detail=f"Mapping not found for '{name_norm}'. Use /hue/map/{{name}}/{{light_id}}")
     return str(lid)
@@ -240,14 +313,11 @@ def hue_register_path(ip: str):
 def hue_list():
     cfg = load_cfg(); require_bridge(cfg)
     lights = hue_get(cfg, "/lights")
-    trimmed = []
-    for lid, info in lights.items():
-        trimmed.append({
-            "id": lid,
-            "name": info.get("name"),
-            "type": info.get("type"),
-            "on": info.get("state", {}).get("on", None)
-        })
+    trimmed = [
+        {"id": lid, "name": info.get("name"), "type": info.get("type"),
+         "on": (info.get("state") or {}).get("on")}
+        for lid, info in lights.items()
+    ]
     return api_ok("list_lights", "lights fetched", lights=json.dumps(trimmed))
 
 @app.get("/hue/status/txt")
@@ -255,24 +325,27 @@ def hue_status_txt():
     cfg = load_cfg(); require_bridge(cfg)
     lights = hue_get(cfg, "/lights")
     lines = []
-    for lid, info in sorted(lights.items(), key=lambda kv: int(kv[0])):
-        nm = info.get("name", "")
-        tp = info.get("type", "")
-        on = info.get("state", {}).get("on", None)
-        lines.append(f"{lid}\t{nm}\t{tp}\t(on={on})")
+    rows = [(int(lid), lid, info) for lid, info in lights.items()]
+    rows.sort(key=itemgetter(0))
+    for _, lid, info in rows:
+        get = info.get
+        on = (get("state") or {}).get("on")
+        lines.append(f"{lid}\t{get('name', '')}\t{get('type', '')}\t(on={on})")
     return api_ok("status_text", "light status fetched", text="\n".join(lines) + ("\n" if lines else ""), count=len(lines))
 
 @app.get("/hue/map/{name}/{light_id}")
 def hue_map_path(name: str, light_id: str):
     cfg = load_cfg()
-    cfg.setdefault("map", {})[_norm_name(name)] = str(light_id)
+    m = cfg.setdefault("map", {})
+    _drop_mapping(m, _norm_name(name))
+    m[_norm_name(name)] = str(light_id)
     save_cfg(cfg)
     return api_ok("map_light", "light mapped", name=_norm_name(name), light_id=str(light_id))
 
 @app.get("/hue/unmap/{name}")
 def hue_unmap_path(name: str):
     cfg = load_cfg()
-    existed = cfg.get("map", {}).pop(_norm_name(name), None)
+    existed = _drop_mapping(cfg.get("map", {}), _norm_name(name))
     save_cfg(cfg)
     return api_ok("unmap_light", "mapping removed", name=_norm_name(name), removed=bool(existed))
 
@@ -290,28 +363,32 @@ def hue_mappings_txt():
     lines = [f"{k} -> {v}" for k, v in sorted(m.items())]
     return api_ok("mappings_text", "mappings fetched", text="\\n".join(lines) + "\\n", count=len(lines))
 
+# the route lists never change; encode them once
+_ROOT_COGS = json.dumps([
+    "/cogs/health",
+    "/cogs/hue/state/{Name_or_Name_With_Underscores}",
+    "/cogs/hue/on/{Name_or_Name_With_Underscores}",
+    "/cogs/hue/off/{Name_or_Name_With_Underscores}",
+])
+_ROOT_ADMIN = json.dumps([
+    "/hue/register/ip/{bridge_ip}",
+    "/hue/list",
+    "/hue/status/txt",
+    "/hue/map/{friendly_name}/{light_id}",
+    "/hue/unmap/{friendly_name}",
+    "/hue/mappings",
+    "/hue/mappings/txt",
+    "/hue/map/all",
+])
+
 @app.get("/")
 def root():
     return api_ok(
         "root",
         "hue server running",
         server_name="hue-server-pathonly",
-        cogs=json.dumps([
-            "/cogs/health",
-            "/cogs/hue/state/{Name_or_Name_With_Underscores}",
-            "/cogs/hue/on/{Name_or_Name_With_Underscores}",
-            "/cogs/hue/off/{Name_or_Name_With_Underscores}",
-        ]),
-        admin=json.dumps([
-            "/hue/register/ip/{bridge_ip}",
-            "/hue/list",
-            "/hue/status/txt",
-            "/hue/map/{friendly_name}/{light_id}",
-            "/hue/unmap/{friendly_name}",
-            "/hue/mappings",
-            "/hue/mappings/txt",
-            "/hue/map/all",
-        ]),
+        cogs=_ROOT_COGS,
+        admin=_ROOT_ADMIN,
     )
 
 @app.get("/hue/map/all")
@@ -323,6 +400,7 @@ def hue_map_all():
     for lid, info in lights.items():
         nm = info.get("name", "").strip()
         if nm:
+            _drop_mapping(cfg["map"], _norm_name(nm))
             cfg["map"][nm] = str(lid)
             added += 1
     save_cfg(cfg)
@@ -387,7 +465,7 @@ def cogs_hue_brightness(name: str, percent: int):
     lid = _resolve_light_id_by_name(cfg, name)
 
     # Clamp percentage 0–100
-    percent = max(0, min(100, int(percent)))
+    percent = max(0, min(100, percent))
 
     # Map 0–100% -> 0–254 bri
     bri = round(percent * 254 / 100)
@@ -415,7 +493,7 @@ def cogs_hue_brightness_up(name: str, delta: int):
     percent_now = round(bri_now * 100 / 254)
 
     # Clamp delta and compute new percentage
-    delta = max(0, min(100, int(delta)))
+    delta = max(0, min(100, delta))
     target_percent = max(0, min(100, percent_now + delta))
 
     # Reuse the main percentage setter
@@ -434,7 +512,7 @@ def cogs_hue_brightness_down(name: str, delta: int):
     bri_now = _get_light_bri(cfg, lid)
     percent_now = round(bri_now * 100 / 254)
 
-    delta = max(0, min(100, int(delta)))
+    delta = max(0, min(100, delta))
     target_percent = max(0, min(100, percent_now - delta))
 
     return cogs_hue_brightness(name, target_percent)
@@ -447,8 +525,8 @@ def cogs_hue_color_hs(name: str, hue: int, sat: int):
     """
     cfg = load_cfg(); require_bridge(cfg)
     lid = _resolve_light_id_by_name(cfg, name)
-    hue = max(0, min(65535, int(hue)))
-    sat = max(0, min(254, int(sat)))
+    hue = max(0, min(65535, hue))
+    sat = max(0, min(254, sat))
     hue_put(cfg, f"/lights/{lid}/state", {"hue": hue, "sat": sat})
     return api_ok("color_hs", "light color updated", name=_norm_name(name), light_id=lid, hue=hue, sat=sat)
 
@@ -460,7 +538,7 @@ def cogs_hue_color_ct(name: str, mireds: int):
     """
     cfg = load_cfg(); require_bridge(cfg)
     lid = _resolve_light_id_by_name(cfg, name)
-    mireds = max(153, min(500, int(mireds)))
+    mireds = max(153, min(500, mireds))
     hue_put(cfg, f"/lights/{lid}/state", {"ct": mireds})
     return api_ok("color_ct", "light color temperature updated", name=_norm_name(name), light_id=lid, ct=mireds)
 
@@ -101,7 +101,7 @@ install_app() {
     set -e
     source '$VENVDIR/bin/activate'
     python -m pip install --upgrade pip wheel
-    python -m pip install fastapi uvicorn requests
+    python -m pip install fastapi 'uvicorn[standard]' requests orjson
   "
 
   # Default config, if missing
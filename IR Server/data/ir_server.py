@@ -1,13 +1,32 @@
 #!/usr/bin/env python3
 import os
+import re
 import json
+import asyncio
 import time
+import array
+import functools
+import itertools
+from collections import Counter, OrderedDict
 from typing import List, Optional, Dict, Any, Tuple
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    # optional: pip install orjson (faster signal file parsing and responses)
+    orjson = None
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 import uvicorn
+import anyio
 
 import pigpio
 import threading
@@ -27,10 +46,17 @@ TOLERANCE_PCT = 0.2          # timing compare tolerance for repeat detection (20
 ROUND_TO_US = 50             # normalize durations to nearest N us for storage
 MAX_CAPTURE_SECONDS = 3.0    # safety cap for learning
 MIN_PULSES_TO_ACCEPT = 6     # ignore tiny/noisy captures
+MAX_CAPTURE_EDGES = 65536    # hard cap on stored edges (noisy receiver / stuck input)
+WAVE_TAIL_LOW_US = 100       # trailing LOW pulse appended to every wave
+TX_WAIT_SLACK_S = 0.002      # wake this early before the wave should end, then poll
+MAX_WAVE_PULSES = 12000      # pigpio per-wave pulse limit (PI_WAVE_MAX_PULSES)
+WAVE_CACHE_MAX = 16          # built waves kept in pigpiod (DMA control blocks are limited)
+WAVE_CHAIN_MAX_BYTES = 600   # pigpio wave_chain command length limit
 
 os.makedirs(SIGNALS_DIR, exist_ok=True)
 
-app = FastAPI(title="IR Learn/Send Server", version="1.1 (COGS-style URLs)")
+app = FastAPI(title="IR Learn/Send Server", version="1.1 (COGS-style URLs)",
+              default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
 
 
 SERVICE_NAME = "ir"
@@ -82,6 +108,12 @@ if not pi.connected:
 pi.set_mode(TX_GPIO, pigpio.OUTPUT)
 pi.set_mode(RX_GPIO, pigpio.INPUT)
 pi.set_pull_up_down(RX_GPIO, pigpio.PUD_OFF)
+pi.wave_clear()  # drop waves left in pigpiod by a previous run
+
+# Serializes use of the TX pin and pigpiod's wave table
+_TX_LOCK = threading.Lock()
+# Set by /cogs/ir/stop so an in-progress send stops waiting for its wave/chain
+_TX_STOP = threading.Event()
 
 # =========================
 # Utilities
@@ -89,6 +121,11 @@ pi.set_pull_up_down(RX_GPIO, pigpio.PUD_OFF)
 def round_us(v: int, step: int = ROUND_TO_US) -> int:
     return int(round(v / step) * step)
 
+def round_durations_us(durations: List[int], step: int = ROUND_TO_US) -> List[int]:
+    # Same as round_us per element; round() is symmetric about zero so marks and
+    # spaces need no sign branch, and it already returns an int.
+    return [round(d / step) * step for d in durations]
+
 def approx_equal(a: int, b: int, tol_pct: float = TOLERANCE_PCT) -> bool:
     m = max(1, max(a, b))
     return abs(a - b) <= m * tol_pct
@@ -96,10 +133,9 @@ def approx_equal(a: int, b: int, tol_pct: float = TOLERANCE_PCT) -> bool:
 def frames_equal(f1: List[int], f2: List[int], tol_pct: float = TOLERANCE_PCT) -> bool:
     if len(f1) != len(f2):
         return False
+    # approx_equal() inlined: with matching signs, |a - b| equals ||a| - |b||
     for a, b in zip(f1, f2):
-        if (a > 0) != (b > 0):
-            return False
-        if not approx_equal(abs(a), abs(b), tol_pct):
+        if (a > 0) != (b > 0) or abs(a - b) > max(1, abs(a), abs(b)) * tol_pct:
             return False
     return True
 
@@ -107,18 +143,16 @@ def compress_repeats(frames: List[List[int]]) -> Tuple[List[int], int, int]:
     if not frames:
         return [], 0, LONG_GAP_US
 
-    norm = [[(round_us(d) if d > 0 else -round_us(-d)) for d in fr] for fr in frames]
+    norm = [round_durations_us(fr) for fr in frames]
     canonical = norm[0]
     repeats = 1
     for fr in norm[1:]:
         if frames_equal(canonical, fr):
             repeats += 1
         else:
-            from collections import Counter
-            key = lambda arr: tuple(arr)
-            counts = Counter([key(f) for f in norm])
-            canonical = list(counts.most_common(1)[0][0])
-            repeats = counts.most_common(1)[0][1]
+            # Frames disagree: fall back to the most common exact frame
+            most, repeats = Counter(map(tuple, norm)).most_common(1)[0]
+            canonical = list(most)
             break
 
     gap_us = LONG_GAP_US
@@ -130,20 +164,104 @@ def compress_repeats(frames: List[List[int]]) -> Tuple[List[int], int, int]:
 
     return canonical, repeats, gap_us
 
+def apply_scale_us(durations: List[int], scale: Optional[float]) -> List[int]:
+    if scale is None or abs(scale - 1.0) < 1e-6:
+        return durations
+    # round() is symmetric about zero, so marks and spaces scale the same way
+    return [round(d * scale) for d in durations]
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    # temp file + rename: a crash mid-save never leaves a half-written signal
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# (dir mtime_ns, sorted names); creating, replacing or removing a file bumps the dir mtime
+_SIGNAL_NAMES: Tuple[int, List[str]] = (-1, [])
+
+def _forget_signal_names():
+    # dir mtimes have clock-tick resolution; don't rely on them for our own writes
+    global _SIGNAL_NAMES
+    _SIGNAL_NAMES = (-1, [])
+
+# Any single path component: no separators or NUL, so a name can't leave SIGNALS_DIR
+_NAME_RE = re.compile(r"[^/\\\x00]{1,128}")
+
+def _signal_path(name: str) -> str:
+    if not _NAME_RE.fullmatch(name):
+        raise HTTPException(400, f"Invalid signal name: '{name}'")
+    return os.path.join(SIGNALS_DIR, f"{name}.json")
+
 def save_signal(name: str, data: Dict[str, Any]) -> None:
-    path = os.path.join(SIGNALS_DIR, f"{name}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    path = _signal_path(name)
+    _write_atomic(path, _json_dumps(data))
+    _forget_signal_names()
+    # write through: same-tick mtimes can't be trusted to tell our own writes apart
+    _load_signal_cached.cache_clear()
+
+# Keyed on the file's identity (os.replace gives a new inode) and mtime, so an edited
+# or re-learned signal is simply a new entry
+@functools.lru_cache(maxsize=256)
+def _load_signal_cached(name: str, ino: int, mtime_ns: int, size: int) -> Dict[str, Any]:
+    with open(_signal_path(name), "rb") as f:
+        return _json_loads(f.read())
 
 def load_signal(name: str) -> Dict[str, Any]:
-    path = os.path.join(SIGNALS_DIR, f"{name}.json")
-    if not os.path.exists(path):
+    """Return the parsed signal. The dict is shared with the cache; treat it as read-only."""
+    try:
+        st = os.stat(_signal_path(name))
+        return _load_signal_cached(name, st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
         raise FileNotFoundError(name)
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+
+# (name, scale) -> (signal dict, scaled durations). The dict identity ties an entry
+# to one version of the file: load_signal() hands out a new dict after a reload.
+# Kept in LRU order so frequently sent keys survive one-off scales.
+_PREPARED: "OrderedDict[Tuple[str, float], Tuple[Dict[str, Any], Tuple[int, ...]]]" = OrderedDict()
+_PREPARED_MAX = 256
+_PREPARED_LOCK = threading.Lock()
+
+def load_prepared(name: str, scale: float) -> Tuple[Dict[str, Any], Tuple[int, ...]]:
+    data = load_signal(name)
+    key = (name, scale)
+    with _PREPARED_LOCK:
+        hit = _PREPARED.get(key)
+        if hit is not None and hit[0] is data:
+            _PREPARED.move_to_end(key)
+            return data, hit[1]
+    durations = tuple(apply_scale_us(data["canonical_durations_us"], scale))
+    with _PREPARED_LOCK:
+        _PREPARED[key] = (data, durations)
+        _PREPARED.move_to_end(key)
+        while len(_PREPARED) > _PREPARED_MAX:
+            _PREPARED.popitem(last=False)
+    return data, durations
 
 def list_signals() -> List[str]:
-    return sorted([fn[:-5] for fn in os.listdir(SIGNALS_DIR) if fn.endswith(".json")])
+    """Sorted signal names. The list is shared between callers; don't mutate it."""
+    global _SIGNAL_NAMES
+    mtime = os.stat(SIGNALS_DIR).st_mtime_ns
+    cached_mtime, names = _SIGNAL_NAMES
+    if cached_mtime != mtime:
+        names = sorted([fn[:-5] for fn in os.listdir(SIGNALS_DIR) if fn.endswith(".json")])
+        _SIGNAL_NAMES = (mtime, names)
+    return names
+
+# (names list it was encoded from, JSON text); a rescan yields a new list object
+_SIGNAL_NAMES_JSON: Tuple[Optional[List[str]], str] = (None, "[]")
+
+def list_signals_json() -> str:
+    """json.dumps(list_signals()), re-encoded only when the listing has changed."""
+    global _SIGNAL_NAMES_JSON
+    names = list_signals()
+    encoded_from, text = _SIGNAL_NAMES_JSON
+    if encoded_from is not names:
+        text = json.dumps(names)
+        _SIGNAL_NAMES_JSON = (names, text)
+    return text
 
 # =========================
 # Capturing (Learn)
@@ -156,7 +274,8 @@ class CaptureSession:
         self.lock = threading.Lock()
         self.last_tick = None
         self.level = pi.read(self.rx)
-        self.raw_us: List[int] = []
+        # Signed mark/space durations; array avoids boxing an int object per edge
+        self.raw_us = array.array("q")
 
     def _edge(self, gpio, level, tick):
         with self.lock:
@@ -166,73 +285,81 @@ class CaptureSession:
                 return
             dt = pigpio.tickDiff(self.last_tick, tick)
             self.last_tick = tick
-            if self.level == 0:
-                self.raw_us.append(+dt)  # mark
-            else:
-                self.raw_us.append(-dt)  # space
+            if len(self.raw_us) >= MAX_CAPTURE_EDGES:
+                return
+            self.raw_us.append(dt if self.level == 0 else -dt)  # mark : space
             self.level = level
 
+    # pigpio calls are socket round-trips to pigpiod; keep them outside self.lock
+    # so the edge callback never waits behind one.
     def start(self):
+        level = pi.read(self.rx)
         with self.lock:
             self.running = True
             self.last_tick = None
-            self.raw_us = []
-            self.level = pi.read(self.rx)
-            self.cb = pi.callback(self.rx, pigpio.EITHER_EDGE, self._edge)
+            self.raw_us = array.array("q")
+            self.level = level
+        cb = pi.callback(self.rx, pigpio.EITHER_EDGE, self._edge)
+        with self.lock:
+            self.cb = cb
 
     def stop(self):
         with self.lock:
-            if self.cb is not None:
-                self.cb.cancel()
-                self.cb = None
+            cb, self.cb = self.cb, None
             self.running = False
+        if cb is not None:
+            cb.cancel()
 
     def get_result(self) -> List[int]:
         with self.lock:
-            trimmed = [d for d in self.raw_us if abs(d) >= 80]
-            if trimmed and trimmed[0] < 0:
-                trimmed = trimmed[1:]
-            return trimmed
+            raw = self.raw_us[:]  # C-level copy; filter outside the lock
+        trimmed = [d for d in raw if d >= 80 or d <= -80]
+        if trimmed and trimmed[0] < 0:
+            del trimmed[0]
+        return trimmed
 
 def split_frames(raw: List[int], gap_us: int = LONG_GAP_US) -> List[List[int]]:
-    frames = []
-    cur = []
-    for d in raw:
-        cur.append(d)
-        if d < 0 and abs(d) >= gap_us:
-            frames.append(cur)
-            cur = []
-    if cur:
-        frames.append(cur)
-    return frames
+    # A frame ends on (and includes) a space of at least gap_us; slice between those
+    ends = [i + 1 for i, d in enumerate(raw) if d <= -gap_us]
+    starts = [0] + ends
+    ends.append(len(raw))
+    return [raw[a:b] for a, b in zip(starts, ends) if a < b]
 
 # =========================
 # Sending (pigpio wave)
 # =========================
-def build_wave_from_durations(durations: List[int], tx_gpio: int, carrier_khz: float) -> int:
-    pulses = []
+@functools.lru_cache(maxsize=8)
+def _carrier_template(tx_gpio: int, carrier_khz: float) -> Tuple[Any, Any, int]:
+    """Shared (on, off, half_period_us) carrier pulses; pigpio only reads them."""
     carrier_period_us = int(round(1000.0 / carrier_khz))
     half = max(1, carrier_period_us // 2)
+    return pigpio.pulse(1 << tx_gpio, 0, half), pigpio.pulse(0, 1 << tx_gpio, half), half
+
+@functools.lru_cache(maxsize=1024)
+def _duration_pulses(dur: int, tx_gpio: int, carrier_khz: float) -> Tuple[Any, ...]:
+    """Pulse segment for one signed duration; IR codes reuse a handful of distinct values."""
+    if dur > 0:
+        on_pulse, off_pulse, half = _carrier_template(tx_gpio, carrier_khz)
+        # Full carrier cycles reuse the template pulses; only the tail is built
+        n, remaining = divmod(dur, 2 * half)
+        seg = [on_pulse, off_pulse] * n
+        if remaining > 0:
+            on_us = min(half, remaining)
+            seg.append(pigpio.pulse(1 << tx_gpio, 0, on_us))
+            remaining -= on_us
+            if remaining > 0:
+                seg.append(pigpio.pulse(0, 1 << tx_gpio, remaining))
+        return tuple(seg)
+    if dur < 0:
+        return (pigpio.pulse(0, 1 << tx_gpio, -dur),)
+    return ()
 
-    for dur in durations:
-        if dur > 0:
-            remaining = dur
-            while remaining > 0:
-                on_us = min(half, remaining)
-                pulses.append(pigpio.pulse(1 << tx_gpio, 0, on_us))
-                remaining -= on_us
-                if remaining <= 0:
-                    break
-                off_us = min(half, remaining)
-                pulses.append(pigpio.pulse(0, 1 << tx_gpio, off_us))
-                remaining -= off_us
-        else:
-            space = -dur
-            if space > 0:
-                pulses.append(pigpio.pulse(0, 1 << tx_gpio, space))
+def build_wave_from_durations(durations: List[int], tx_gpio: int, carrier_khz: float) -> int:
+    pulses = list(itertools.chain.from_iterable(
+        _duration_pulses(int(d), tx_gpio, carrier_khz) for d in durations))
 
     # *** Important: finish LOW so the line doesn't stick high ***
-    pulses.append(pigpio.pulse(0, 1 << tx_gpio, 100))  # 100us off
+    pulses.append(pigpio.pulse(0, 1 << tx_gpio, WAVE_TAIL_LOW_US))
 
     pi.wave_add_generic(pulses)
     wave_id = pi.wave_create()
@@ -240,48 +367,128 @@ def build_wave_from_durations(durations: List[int], tx_gpio: int, carrier_khz: f
         raise RuntimeError("wave_create failed")
     return wave_id
 
+# (durations, carrier_khz) -> pigpiod wave id, LRU order. Guarded by _TX_LOCK.
+_WAVE_CACHE: "OrderedDict[Tuple[Tuple[int, ...], float], int]" = OrderedDict()
+# Set by stop_tx(); the next send flushes the cache under _TX_LOCK. Clearing from
+# stop_tx() itself could free a wave id a concurrent _get_wave is about to cache.
+_WAVE_CACHE_STALE = False
+
+def _flush_wave_cache():
+    _WAVE_CACHE.clear()
+    try:
+        pi.wave_clear()
+    except pigpio.error:
+        pass
+
+def _get_wave(durations: List[int], carrier_khz: float) -> int:
+    """Return a wave id for this frame, building it only on a cache miss."""
+    key = (tuple(durations), carrier_khz)
+    wave_id = _WAVE_CACHE.pop(key, None)
+    if wave_id is None:
+        while len(_WAVE_CACHE) >= WAVE_CACHE_MAX:
+            _, old_id = _WAVE_CACHE.popitem(last=False)
+            try:
+                pi.wave_delete(old_id)
+            except pigpio.error:
+                pass
+        try:
+            wave_id = build_wave_from_durations(durations, TX_GPIO, carrier_khz)
+        except pigpio.error:
+            # Out of wave ids/control blocks (deletes out of order fragment the
+            # table): start from an empty table and try once more.
+            _flush_wave_cache()
+            wave_id = build_wave_from_durations(durations, TX_GPIO, carrier_khz)
+    _WAVE_CACHE[key] = wave_id
+    return wave_id
+
+def _delay_cmds(us: int) -> List[int]:
+    """wave_chain delay commands for `us` microseconds (each command tops out at 65535)."""
+    cmds = []
+    while us > 0:
+        step = min(us, 0xFFFF)
+        cmds += [255, 2, step & 0xFF, step >> 8]
+        us -= step
+    return cmds
+
+def _wait_tx_done(total_s: float):
+    """Return when pigpiod reports the wave/chain finished, or as soon as /cogs/ir/stop fires."""
+    # Sleep through the known length instead of polling pigpiod the whole time
+    if _TX_STOP.wait(max(0.0, total_s - TX_WAIT_SLACK_S)):
+        return
+    while pi.wave_tx_busy():
+        time.sleep(0.0005)
+
 def send_durations(durations: List[int], repeat: int, gap_us: int, carrier_khz: float):
     if not durations:
         return
 
-    # Build frame once (ends LOW in build_wave_from_durations)
-    frame_id = build_wave_from_durations(durations, TX_GPIO, carrier_khz)
-    try:
+    # One transmitter, one wave table: concurrent requests must not clear each other's waves
+    global _WAVE_CACHE_STALE
+    with _TX_LOCK:
+        _TX_STOP.clear()
+        if _WAVE_CACHE_STALE:
+            _WAVE_CACHE_STALE = False
+            _flush_wave_cache()
+        # Frame waves end LOW (build_wave_from_durations) and stay in pigpiod for
+        # reuse, so a repeat send of the same signal skips the wave upload entirely
+        frame_id = _get_wave(durations, carrier_khz)
+        frame_us = sum(abs(d) for d in durations) + WAVE_TAIL_LOW_US
         rep = max(1, int(repeat))
-        for i in range(rep):
-            pi.wave_send_once(frame_id)
-            while pi.wave_tx_busy():
-                time.sleep(0.001)
-            if i < rep - 1 and gap_us > 0:
-                time.sleep(gap_us / 1_000_000.0)
-    finally:
-        try:
-            pi.wave_tx_stop()
-        except pigpio.error:
-            pass
-        pi.write(TX_GPIO, 0)    # hard force LOW
+        gap_us = max(0, int(gap_us))
+        completed = False
         try:
-            pi.wave_delete(frame_id)
-        except pigpio.error:
-            pass
-        try:
-            pi.wave_clear()     # release any lingering wave resources
-        except pigpio.error:
-            pass
+            chain = None
+            if rep > 1 and rep - 1 <= 0xFFFF:
+                # Repeats are timed by pigpiod's DMA, not Python sleeps:
+                # (frame, gap) looped rep-1 times, then the final frame.
+                loops = rep - 1
+                chain = ([255, 0, frame_id] + _delay_cmds(gap_us)
+                         + [255, 1, loops & 0xFF, loops >> 8, frame_id])
+                if len(chain) > WAVE_CHAIN_MAX_BYTES:
+                    chain = None  # gap too long to encode (~9.8 s+)
+            if chain is not None:
+                pi.wave_chain(chain)
+                _wait_tx_done((rep * frame_us + (rep - 1) * gap_us) / 1_000_000.0)
+            else:
+                # Single frame, or a repeat/gap a chain can't hold: send frame by
+                # frame and wait out the gaps here (a stop cuts the wait short).
+                for i in range(rep):
+                    pi.wave_send_once(frame_id)
+                    _wait_tx_done(frame_us / 1_000_000.0)
+                    if _TX_STOP.is_set():
+                        break
+                    if i < rep - 1 and gap_us > 0 and _TX_STOP.wait(gap_us / 1_000_000.0):
+                        break
+            completed = not _TX_STOP.is_set()
+        finally:
+            # A finished wave is idle and already LOW (tail pulse); only an
+            # interrupted send needs the explicit stop + force LOW.
+            if not completed:
+                try:
+                    pi.wave_tx_stop()
+                except pigpio.error:
+                    pass
+                pi.write(TX_GPIO, 0)    # hard force LOW
 
 # =========================
 # Simple helper: parse "ms" CSV into ints
 # =========================
 def parse_ms_csv(ms_csv: str) -> List[int]:
-    out = []
-    for token in ms_csv.split(","):
-        token = token.strip()
-        if not token:
-            continue
-        try:
-            out.append(int(token))
-        except Exception:
-            raise HTTPException(400, f"Bad ms value: '{token}'")
+    tokens = ms_csv.split(",")
+    try:
+        # int() tolerates surrounding whitespace; filter(str.strip) drops empty tokens
+        out = list(map(int, filter(str.strip, tokens)))
+    except ValueError:
+        # slow path only to name the offending token; always a client error
+        bad = ""
+        for token in tokens:
+            token = token.strip()
+            try:
+                int(token or 0)
+            except ValueError:
+                bad = token
+                break
+        raise HTTPException(400, f"Bad ms value: '{bad}'")
     if not out:
         raise HTTPException(400, "No ms values provided")
     if out[0] < 0:
@@ -292,23 +499,37 @@ def parse_ms_csv(ms_csv: str) -> List[int]:
 # COGS-style GET endpoints (no headers required)
 # =========================
 @app.get("/cogs/ir/learn")
-def learn_get(
+async def learn_get(
     name: Optional[str] = Query(default=None),
     timeout_s: float = Query(default=1.5, ge=0.2, le=MAX_CAPTURE_SECONDS),
     long_gap_us: int = Query(default=LONG_GAP_US, ge=2000),
 ):
+    if name:
+        _signal_path(name)  # reject a bad name before spending the capture window
+    # pigpio calls are round-trips to pigpiod: keep them off the event loop
+    cap = await run_in_threadpool(_start_capture)
+    try:
+        # Edges arrive on pigpio's callback thread; no need to park a worker for the window
+        await asyncio.sleep(timeout_s)
+    finally:
+        # also on client disconnect, or the edge callback would outlive the request
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(cap.stop)
+    # Framing + the fsync'd save still block, so they go back to the threadpool
+    return await run_in_threadpool(_finish_learn, cap, name, long_gap_us)
+
+def _start_capture() -> CaptureSession:
     cap = CaptureSession(RX_GPIO)
     cap.start()
-    time.sleep(timeout_s)
-    cap.stop()
+    return cap
 
+def _finish_learn(cap: CaptureSession, name: Optional[str], long_gap_us: int):
     raw = cap.get_result()
     if len(raw) < MIN_PULSES_TO_ACCEPT:
         raise HTTPException(400, "No valid IR activity captured. Try again while pressing a remote key.")
 
     frames = split_frames(raw, gap_us=long_gap_us)
-    canonical, repeats, gap_us = compress_repeats(frames)
-    canonical = [(round_us(d) if d > 0 else -round_us(-d)) for d in canonical]
+    canonical, repeats, gap_us = compress_repeats(frames)  # already rounded to ROUND_TO_US
 
     result = api_ok("learn", "ir signal learned", frames_detected=len(frames), canonical_durations_us=json.dumps(canonical), repeats=repeats, gap_us=gap_us, total_pulses=len(raw))
 
@@ -340,12 +561,12 @@ def send_saved_get(
     carrier: Optional[float] = Query(default=None),  # kHz
     scale: Optional[float] = Query(default=1.0),
 ):
+    scale = float(scale or 1.0)
     try:
-        data = load_signal(name)
+        data, scaled = load_prepared(name, scale)
     except FileNotFoundError:
         raise HTTPException(404, f"Signal '{name}' not found")
 
-    durations = data["canonical_durations_us"]
     repeats = data.get("repeats", 1)
     gap_us = data.get("gap_us", LONG_GAP_US)
     carrier_khz = data.get("carrier_khz", CARRIER_KHZ_DEFAULT)
@@ -354,9 +575,6 @@ def send_saved_get(
         repeats = max(1, int(repeat))
     if carrier is not None:
         carrier_khz = float(carrier)
-    scale = float(scale or 1.0)
-
-    scaled = [int(round(d * scale)) if d > 0 else -int(round((-d) * scale)) for d in durations]
 
     try:
         send_durations(scaled, repeat=repeats, gap_us=gap_us, carrier_khz=carrier_khz)
@@ -370,9 +588,13 @@ def send_raw_get(
     ms: str = Query(..., description="Comma-separated signed microsecond durations (e.g. 900,-450,...)"),
     repeat: int = Query(default=1, ge=1),
     gap_us: int = Query(default=LONG_GAP_US, ge=0),
-    carrier: float = Query(default=CARRIER_KHZ_DEFAULT, description="Carrier in kHz (e.g. 38)"),
+    carrier: float = Query(default=CARRIER_KHZ_DEFAULT, gt=0, description="Carrier in kHz (e.g. 38)"),
 ):
     durations = parse_ms_csv(ms)
+    # Each carrier cycle is two pulses; refuse what pigpiod can't hold before building anything
+    mark_us = sum(d for d in durations if d > 0)
+    if mark_us * carrier / 500.0 + len(durations) > MAX_WAVE_PULSES:
+        raise HTTPException(400, "Signal too long for a single pigpio wave")
     try:
         send_durations(durations, repeat=repeat, gap_us=gap_us, carrier_khz=carrier)
     except Exception as e:
@@ -383,11 +605,11 @@ def send_raw_get(
 # Convenience/inspection (also GET)
 @app.get("/cogs/ir/status")
 def status_get():
-    return api_ok("status", "ir status fetched", tx_gpio=TX_GPIO, rx_gpio=RX_GPIO, signals=json.dumps(list_signals()))
+    return api_ok("status", "ir status fetched", tx_gpio=TX_GPIO, rx_gpio=RX_GPIO, signals=list_signals_json())
 
 @app.get("/cogs/ir/signals")
 def signals_get():
-    return api_ok("signals", "ir signals fetched", signals=json.dumps(list_signals()))
+    return api_ok("signals", "ir signals fetched", signals=list_signals_json())
 
 @app.get("/cogs/ir/signal")
 def signal_get(name: str = Query(...)):
@@ -399,32 +621,41 @@ def signal_get(name: str = Query(...)):
 
 @app.get("/cogs/ir/delete")
 def delete_get(name: str = Query(...)):
-    path = os.path.join(SIGNALS_DIR, f"{name}.json")
-    if not os.path.exists(path):
+    try:
+        os.unlink(_signal_path(name))
+    except FileNotFoundError:
         raise HTTPException(404, f"Signal '{name}' not found")
-    os.remove(path)
+    _load_signal_cached.cache_clear()
+    _forget_signal_names()
     return api_ok("delete", "ir signal deleted", deleted=name)
 
 @app.get("/cogs/ir/stop")
 def stop_tx():
+    global _WAVE_CACHE_STALE
+    _TX_STOP.set()
     try:
         pi.wave_tx_stop()
     except pigpio.error:
         pass
     pi.write(TX_GPIO, 0)
-    try:
-        pi.wave_clear()
-    except pigpio.error:
-        pass
+    _WAVE_CACHE_STALE = True
     return api_ok("stop", "ir transmission stopped", stopped=True)
 
 # =========================
 # Graceful shutdown
 # =========================
+_cleaned = False
+
 def _cleanup():
+    # Runs from the signal handler and again from atexit on the way out; only once
+    global _cleaned
+    if _cleaned:
+        return
+    _cleaned = True
     try:
         if pi is not None:
             pi.write(TX_GPIO, 0)
+            pi.wave_clear()     # cached waves live in pigpiod, not in this process
             pi.stop()
     except Exception:
         pass
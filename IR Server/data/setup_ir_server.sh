@@ -107,7 +107,7 @@ install_app() {
     set -e
     source '${VENV_DIR}/bin/activate'
     python -m pip install --upgrade pip wheel
-    python -m pip install fastapi uvicorn pigpio pydantic
+    python -m pip install fastapi 'uvicorn[standard]' pigpio pydantic orjson
   "
 
   # Ensure pigpiod is running.
@@ -11,7 +11,7 @@ PORT="${PORT:-8000}"
 REPO_ROOT="${ESCAPEROOM_REPO_DIR:-/opt/escaperoomservers/repo}"
 
 APT_PKGS=(mpv python3 python3-venv python3-pip fontconfig fonts-dejavu-core curl)
-PIP_PKGS=(fastapi "uvicorn[standard]" python-mpv pydantic requests)
+PIP_PKGS=(fastapi "uvicorn[standard]" python-mpv pydantic requests orjson)
 
 # Choose the service user
 if [[ -n "${SUDO_USER-}" ]] && id -u "$SUDO_USER" &>/dev/null; then
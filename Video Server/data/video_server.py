@@ -1,13 +1,27 @@
 #!/usr/bin/env python3
-import argparse, json, os, socket, subprocess, threading, time
+import argparse, contextlib, functools, heapq, itertools, json, os, queue, re, selectors, socket, subprocess, threading, time
 from typing import Optional, Tuple
+from urllib.parse import parse_qs
 try:
     from typing import Literal
 except Exception:
     # for Python 3.8/3.9 if needed: pip install typing_extensions
     from typing_extensions import Literal
+try:
+    import orjson
+    _ipc_loads = orjson.loads  # takes bytes directly
+    def _ipc_dumps(obj) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+except ImportError:
+    # optional: pip install orjson (faster mpv IPC encode/decode)
+    orjson = None
+    def _ipc_loads(line: bytes):
+        return json.loads(line.decode("utf-8", errors="ignore"))
+    def _ipc_dumps(obj) -> bytes:
+        return (json.dumps(obj) + "\n").encode("utf-8")
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
 
@@ -17,6 +31,17 @@ def _first(v):
         return v[0] if v else None
     return v
 
+# ASS \an numpad anchor -> (x half-widths, x margin sign, y half-heights, y margin sign):
+# x = w*hx//2 + sx*mx, y = h*hy//2 + sy*my
+_ANCHOR_TABLE = {7: (0, 1, 0, 1), 8: (1, 1, 0, 1), 9: (2, -1, 0, 1),
+                 4: (0, 1, 1, 1), 5: (1, 1, 1, 1), 6: (2, -1, 1, 1),
+                 1: (0, 1, 2, -1), 2: (1, 1, 2, -1), 3: (2, -1, 2, -1)}
+
+def _anchor_xy(anchor: int, mx: int, my: int, w: int = 1000, h: int = 1000) -> Tuple[int, int]:
+    """Anchor + margins -> \\pos() pixels on a w×h canvas (unknown anchors act like 3)."""
+    hx, sx, hy, sy = _ANCHOR_TABLE.get(anchor, (2, -1, 2, -1))
+    return w * hx // 2 + sx * mx, h * hy // 2 + sy * my
+
 def _to_ass_bgr_color(color: Optional[str], default_ass: str) -> str:
     """Convert a user color to ASS BGR format (&HBBGGRR&).
     Accepts:
@@ -43,6 +68,31 @@ def _to_ass_bgr_color(color: Optional[str], default_ass: str) -> str:
     return f"&H{bb}{gg}{rr}&"
 
 
+MAX_NOHEADER_BODY = 64 * 1024  # COGS sends a few hundred bytes; don't preallocate past this
+
+
+async def _read_body(request: Request) -> bytes:
+    """Read the request body into one buffer sized from Content-Length when it's trustworthy."""
+    try:
+        cl = int(request.headers.get("content-length") or -1)
+    except ValueError:
+        cl = -1
+    if not 0 <= cl <= MAX_NOHEADER_BODY:
+        return await request.body()
+    buf = bytearray(cl)
+    off = 0
+    async for chunk in request.stream():
+        n = len(chunk)
+        if off + n > cl:  # client lied about the length; keep everything anyway
+            buf[off:] = chunk
+        else:
+            buf[off:off + n] = chunk
+        off += n
+    if off < cl:
+        del buf[off:]
+    return bytes(buf)
+
+
 async def _parse_noheader_body(request: Request) -> dict:
     """
     Accepts POST bodies without Content-Type.
@@ -52,20 +102,18 @@ async def _parse_noheader_body(request: Request) -> dict:
       - empty body (falls back to query params)
     """
     try:
-        raw = await request.body()
+        raw = (await _read_body(request)).strip()
         if not raw:
             return dict(request.query_params)
-        s = raw.decode("utf-8", errors="ignore").strip()
-        # Try JSON
-        if s and s[0] in "{[":
-            import json
+        # Try JSON (json.loads takes the bytes as-is)
+        if raw[:1] in (b"{", b"["):
             try:
-                d = json.loads(s)
+                d = json.loads(raw)
                 return d if isinstance(d, dict) else {}
             except Exception:
                 pass
+        s = raw.decode("utf-8", errors="ignore")
         # Try querystring form: a=b&c=d
-        from urllib.parse import parse_qs
         d = {k: _first(v) for k, v in parse_qs(s, keep_blank_values=True).items()}
         return d or dict(request.query_params)
     except Exception:
@@ -80,65 +128,247 @@ import traceback, logging, pathlib
 DEFAULT_MPV_SOCKET_PATH = "/run/video-server/mpv.sock"
 MPV_SOCKET_PATH = os.getenv("MPV_SOCKET_PATH", DEFAULT_MPV_SOCKET_PATH)
 TOAST_WRAP_CHARS = 15   # ← change this to whatever wrap length you want
+TOAST_COALESCE_S = 0.016  # toasts arriving within one frame are drawn once, last one wins
+STATUS_TIME_TTL_S = 0.1   # /status polls within this window share one time-pos query
+IPC_RECV_BYTES = 65536  # one recv covers a whole track-list/playlist reply
+IPC_SOCK_BUF = 1 << 20  # SO_RCVBUF/SO_SNDBUF request (kernel clamps to net.core.*mem_max)
+
+# Cue paths repeat and the working directory never changes, so normalise each once
+_abspath = functools.lru_cache(maxsize=512)(os.path.abspath)
+
+
+# ======== Overlay ASS builders ========
+
+_TOAST_ALIGN = {
+    "top-left":7, "top-center":8, "top-right":9,
+    "center-left":4, "center":5, "center-right":6,
+    "bottom-left":1, "bottom-center":2, "bottom-right":3,
+}
+
+_TOAST_STYLE = "\\bord3\\1c&HFFFFFF&\\3c&H000000&"  # white with black outline
+_MSG_FADE = "\\fad(0,0)"
+
+def _wrap_words(s: str, maxc: int) -> str:
+    """Fixed-length, word-boundary wrapping; lines joined with ASS \\N."""
+    words = (s or "").split()
+    if not words:
+        return ""
+    # track each line as a word list + running length; one join per line
+    lines, cur, n = [], [words[0]], len(words[0])
+    for w in words[1:]:
+        if n + 1 + len(w) <= maxc:
+            cur.append(w)
+            n += 1 + len(w)
+        else:
+            lines.append(" ".join(cur))
+            cur, n = [w], len(w)
+    lines.append(" ".join(cur))
+    return "\\N".join(lines)
+
+@functools.lru_cache(maxsize=128)
+def _build_toast_ass(text: str, font: Optional[str], size: Optional[int], a: int,
+                     mx: int, my: int, rotate_deg: int, wrap_chars: int) -> str:
+    """Minimal ASS for overlay_text: font, size, outline, rotation, explicit position."""
+    x_px, y_px = _anchor_xy(a, mx, my)
+    wrapped = _wrap_words(text, wrap_chars)
+    font_tag = f"\\fn{font}" if font else ""
+    size_tag = f"\\fs{size}" if size is not None else ""
+    rot_tag  = f"\\frz{rotate_deg}" if rotate_deg else ""
+    return f"{{\\an{a}{font_tag}{size_tag}{_TOAST_STYLE}\\pos({x_px},{y_px}){rot_tag}}}{wrapped}"
+
+@functools.lru_cache(maxsize=128)
+def _build_msg_ass(text: str, font: Optional[str], font_size: int, a: int,
+                   mx: int, my: int, rotate_deg: int, tc: str, oc: str) -> str:
+    """ASS for show_osd_message: style + rotation + position from anchor/margins."""
+    x_px, y_px = _anchor_xy(a, mx, my)
+    font_tag = f"\\fn{font}" if font else ""
+    return (f"{{\\an{a}{font_tag}\\fs{font_size}\\bord4\\1c{tc}\\3c{oc}{_MSG_FADE}"
+            f"\\pos({x_px},{y_px})\\frz{rotate_deg}}}{text}")
+
+
+# ======== Deferred overlay callbacks ========
+
+class _TimerHandle:
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class _TimerThread:
+    """One daemon thread that runs every toast/message blanking callback, instead of a
+    fresh OS thread per threading.Timer. Handles have the same cancel() as Timer."""
+
+    def __init__(self):
+        self._cv = threading.Condition()
+        self._heap = []                   # (due, seq, handle, fn)
+        self._seq = itertools.count()
+        threading.Thread(target=self._run, name="overlay-timers", daemon=True).start()
+
+    def call_later(self, delay: float, fn) -> _TimerHandle:
+        h = _TimerHandle()
+        with self._cv:
+            heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay), next(self._seq), h, fn))
+            self._cv.notify()
+        return h
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while True:
+                    if not self._heap:
+                        self._cv.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        _, _, h, fn = heapq.heappop(self._heap)
+                        break
+                    self._cv.wait(wait)
+            if not h.cancelled:
+                try:
+                    fn()
+                except Exception:
+                    pass
+
 
 # ======== mpv JSON IPC helper ========
 
+@functools.lru_cache(maxsize=64)
+def _get_property_prefix(name: str) -> bytes:
+    """Encoded get_property request up to (not including) its request_id digits."""
+    return _ipc_dumps({"command": ["get_property", name], "request_id": 0})[:-len(b"0}\n")]
+
+
 class MPVIPC:
     def __init__(self, socket_path: str):
         self.socket_path = socket_path
         self._sock = None
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()  # event callbacks may re-enter send()/request()
         self._event_listeners = []
+        self._next_req_id = itertools.count(1).__next__
+        self._pending = {}                 # request_id -> SimpleQueue awaiting its reply
+        self._events = queue.SimpleQueue() # reader -> event thread
+        self._event_thread = None
         self._running = False
         self.persistent_volume = None
 
 
-    def connect(self, timeout=10.0):
+    def connect(self, timeout=10.0, proc=None):
         start = time.monotonic()
+        # mpv usually creates the socket within a few ms: retry quickly at first, then
+        # back off to 20 ms so a slow start doesn't spin
+        delay = 0.001
         while True:
+            if proc is not None and proc.poll() is not None:
+                # mpv already exited (bad --vo etc.); no point waiting out the timeout
+                raise RuntimeError(f"mpv exited with code {proc.returncode} before opening {self.socket_path}")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
             try:
-                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-                self._sock.connect(self.socket_path)
-                self._sock.settimeout(0.2)
+                sock.connect(self.socket_path)
+                sock.settimeout(0.2)
+                for opt in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+                    try:
+                        sock.setsockopt(socket.SOL_SOCKET, opt, IPC_SOCK_BUF)
+                    except OSError:
+                        pass
+                # the one connection for this mpv: the reader, request() and send() all share it
+                self._sock = sock
                 break
             except (FileNotFoundError, ConnectionRefusedError, OSError):
+                sock.close()  # don't leave an fd per failed attempt for the GC to find
                 if time.monotonic() - start > timeout:
                     raise RuntimeError(f"Could not connect to mpv IPC at {self.socket_path}")
-                time.sleep(0.05)
+                time.sleep(delay)
+                delay = min(delay * 2, 0.02)
         self._running = True
         threading.Thread(target=self._reader_loop, daemon=True).start()
+        self._event_thread = threading.Thread(target=self._event_loop, daemon=True)
+        self._event_thread.start()
 
     def close(self):
         self._running = False
+        try:
+            if self._sock:
+                # shutdown() wakes the reader's select() with EOF before the fd goes away
+                self._sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
         try:
             if self._sock:
                 self._sock.close()
         except Exception:
             pass
 
+    @staticmethod
+    def _drain_lines(buf: bytearray) -> list:
+        """Parse and remove every complete JSON line in buf; a trailing partial line stays put."""
+        msgs = []
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            line = bytes(buf[start:nl]).strip()
+            start = nl + 1
+            if not line:
+                continue
+            try:
+                msgs.append(_ipc_loads(line))
+            except ValueError:
+                pass
+        if start:
+            del buf[:start]
+        return msgs
+
     def _reader_loop(self):
-        buf = b""
+        buf = bytearray()
+        # one scratch buffer for the life of the connection; recv_into fills it in place
+        # rather than allocating a fresh bytes object per read
+        scratch = bytearray(IPC_RECV_BYTES)
+        view = memoryview(scratch)
+        # Park in the kernel until mpv has something to say instead of waking
+        # every socket timeout just to find nothing there.
+        sel = selectors.DefaultSelector()
+        sel.register(self._sock, selectors.EVENT_READ)
         while self._running:
             try:
-                chunk = self._sock.recv(4096)
-                if not chunk:
-                    time.sleep(0.05)
-                    continue
-                buf += chunk
-                while b"\n" in buf:
-                    line, buf = buf.split(b"\n", 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        msg = json.loads(line.decode("utf-8", errors="ignore"))
-                        self._dispatch_event(msg)
-                    except json.JSONDecodeError:
-                        pass
+                sel.select()
+                n = self._sock.recv_into(scratch)
+                if not n:
+                    break  # mpv closed the socket (exit/crash) or close() was called
+                buf += view[:n]
+                for msg in self._drain_lines(buf):
+                    rid = msg.get("request_id")
+                    if rid is not None:
+                        q = self._pending.pop(rid, None)
+                        if q is not None:
+                            q.put(msg)
+                            continue
+                    if "event" in msg:
+                        self._events.put(msg)
             except socket.timeout:
                 continue
-            except OSError:
+            except (OSError, ValueError):
+                break
+        sel.close()
+        view.release()
+        # wake anyone still waiting on a reply and let the event thread exit
+        for rid in list(self._pending):
+            q = self._pending.pop(rid, None)
+            if q is not None:
+                q.put({"error": "disconnected"})
+        self._events.put(None)
+
+    def _event_loop(self):
+        # Listeners run here, not on the reader, so they can issue request()s of their own.
+        while True:
+            msg = self._events.get()
+            if msg is None:
                 break
+            self._dispatch_event(msg)
 
     def _dispatch_event(self, msg):
         if "event" in msg:
@@ -151,48 +381,75 @@ class MPVIPC:
     def on_event(self, callback):
         self._event_listeners.append(callback)
 
+    def in_event_thread(self) -> bool:
+        """True when called from a listener; such code can't wait for a later event."""
+        return threading.current_thread() is self._event_thread
+
     def send(self, command: list, request_id: Optional[int] = None) -> dict:
         payload = {"command": command}
         if request_id is not None:
             payload["request_id"] = request_id
-        data = (json.dumps(payload) + "\n").encode("utf-8")
+        data = _ipc_dumps(payload)
         with self._lock:
             self._sock.sendall(data)
         return {}
 
-    def request(self, command: list) -> dict:
-        req_id = int(time.time()*1000000) & 0x7fffffff
-        payload = {"command": command, "request_id": req_id}
-        data = (json.dumps(payload) + "\n").encode("utf-8")
+    def send_many(self, commands: list) -> dict:
+        """Fire several commands in one write; mpv handles each newline-delimited line in order."""
+        data = b"".join(_ipc_dumps({"command": c}) for c in commands)
         with self._lock:
             self._sock.sendall(data)
-        deadline = time.monotonic() + 2.0
-        partial = b""
-        while time.monotonic() < deadline:
-            try:
-                data = self._sock.recv(4096)
-                if not data:
-                    time.sleep(0.01)
-                    continue
-                partial += data
-                for raw in partial.split(b"\n"):
-                    raw = raw.strip()
-                    if not raw:
-                        continue
-                    try:
-                        msg = json.loads(raw.decode("utf-8", errors="ignore"))
-                        if msg.get("request_id") == req_id:
-                            return msg
-                        if "event" in msg:
-                            self._dispatch_event(msg)
-                    except json.JSONDecodeError:
-                        continue
-                partial = b""
-            except socket.timeout:
-                continue
-            except OSError:
-                break
-        return {"error": "timeout"}
+        return {}
+
+    @staticmethod
+    def _encode_request(command: list, req_id: int) -> bytes:
+        if len(command) == 2 and command[0] == "get_property" and isinstance(command[1], str):
+            # the common case: reuse the pre-encoded text, only the id changes
+            return _get_property_prefix(command[1]) + b"%d}\n" % req_id
+        return _ipc_dumps({"command": command, "request_id": req_id})
+
+    def request(self, command: list) -> dict:
+        req_id = self._next_req_id() & 0x7fffffff
+        data = self._encode_request(command, req_id)
+        # The reader thread owns the socket's receive side and hands our reply over.
+        q = queue.SimpleQueue()
+        self._pending[req_id] = q
+        try:
+            with self._lock:
+                self._sock.sendall(data)
+            return q.get(timeout=2.0)
+        except queue.Empty:
+            return {"error": "timeout"}
+        except OSError:
+            return {"error": "disconnected"}
+        finally:
+            self._pending.pop(req_id, None)
+
+    def request_many(self, commands: list) -> list:
+        """Pipeline several requests in one write and wait for all replies (same order as commands)."""
+        ids, qs, lines = [], [], []
+        for c in commands:
+            req_id = self._next_req_id() & 0x7fffffff
+            q = queue.SimpleQueue()
+            self._pending[req_id] = q
+            ids.append(req_id); qs.append(q)
+            lines.append(self._encode_request(c, req_id))
+        out = []
+        try:
+            with self._lock:
+                self._sock.sendall(b"".join(lines))
+            deadline = time.monotonic() + 2.0
+            for q in qs:
+                try:
+                    out.append(q.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    out.append({"error": "timeout"})
+        except OSError:
+            out = [{"error": "disconnected"}] * len(commands)
+        finally:
+            for req_id in ids:
+                self._pending.pop(req_id, None)
+        return out
 
     def set_property(self, name, value):
         return self.send(["set_property", name, value])
@@ -203,16 +460,25 @@ class MPVIPC:
             return rsp.get("data")
         return None
 
+    def get_properties(self, *names) -> list:
+        """Like get_property for several names, in a single round trip."""
+        rsps = self.request_many([["get_property", n] for n in names])
+        return [r.get("data") if r.get("error") == "success" else None for r in rsps]
+
     def command(self, *args):
         return self.send(list(args))
 
 
 # ======== Video Controller ========
 
+# mpv properties mirrored into VideoController via property-change events (see _on_mpv_event).
+# Low-rate ones only: time-pos/time-remaining would push an event per frame through the socket.
+_OBSERVED_PROPS = ("video-rotate", "osd-width", "osd-height")
+
 class VideoController:
     def __init__(self, main_path: Optional[str], fullscreen: bool):
         self.socket_path = MPV_SOCKET_PATH
-        self.main_path = os.path.abspath(main_path) if main_path else None
+        self.main_path = _abspath(main_path) if main_path else None
         self._proc = None
         self.mpv = None
         self.interrupt_active = False
@@ -222,24 +488,34 @@ class VideoController:
         self.interrupt_start = 0.0
         self._loop_for_next_file = True  # applied on 'file-loaded'
         self._pending_interrupt_path = None  # set when /interrupt/* starts; armed on file-loaded
+        self.persistent_volume = None    # set by /cogs/volume; reapplied on every file-loaded
+        self._file_loaded_evt = threading.Event()  # set by the next file-loaded after _play_file arms it
         self._osd_timer_thread = None
         self._osd_timer_stop = threading.Event()
         self._osd_timer_end = 0.0
         self._osd_timer_rotation = 180   # 0/90/180/270
         self._osd_timer_anchor = 9       # 7/8/9 top, 4/5/6 middle, 1/2/3 bottom
         self._osd_timer_font = 72
+        self._video_rotate = 0           # mirrored from mpv via observe_property
+        self._osd_size = [1920, 1080]    # osd-width/osd-height, same
+        self._osd_level = 0              # shadow of mpv's osd-level (--osd-level=0); None = unknown
+        self._time_lock = threading.Lock()
+        self._time_cache = (-1.0, 0.0)   # (monotonic stamp, time-pos) for get_time_cached
+        self._time_gens = itertools.count(1)
+        self._time_gen = 0               # bumped per file switch; a query from an older one isn't cached
         self._start_mpv(fullscreen=fullscreen)
         self._msg_ovl_id = 701         # separate from the timer’s ID (700)
-        self._msg_remove_timer = None   # threading.Timer handle
+        self._msg_remove_timer = None   # _TimerHandle
+        self._timers = _TimerThread()   # runs toast/message blanking
+        self._toast_lock = threading.Lock()
+        self._toast_pending = None      # latest toast ASS not yet sent to mpv
+        self._toast_flush = None        # _TimerHandle of the scheduled draw, if any
         #self.timer = CountdownTimer(self.mpv)
 
     def _osd_map_xy_for_rotation(self, x_px: int, y_px: int) -> Tuple[int, int]:
         """Map desired on-screen (viewer) coords to mpv's pre-rotation OSD coords."""
         W, H = self._osd_get_size()
-        try:
-            rot = int(self.mpv.get_property("video-rotate") or 0) % 360
-        except Exception:
-            rot = 0
+        rot = self._video_rotate  # kept current by the observe_property in _start_mpv
 
         if rot == 0:
             return x_px, y_px
@@ -256,6 +532,17 @@ class VideoController:
             return x_px, y_px
     
     
+    def _get_osd_level(self) -> int:
+        # shadow copy; only ask mpv when a file change may have reset it
+        if self._osd_level is None:
+            self._osd_level = int(self.mpv.get_property("osd-level"))
+        return self._osd_level
+
+    def _set_osd_level(self, level: int):
+        if self._osd_level != level:
+            self.mpv.set_property("osd-level", level)
+            self._osd_level = level
+
     def _ovl_update(self, ovl_id: int, ass_text: str, *, res_x: int = 1000, res_y: int = 1000, z: int = 0):
         """Draw/replace a persistent ASS overlay (independent of the current video)."""
         try:
@@ -282,14 +569,23 @@ class VideoController:
         except Exception:
             pass
 
-        if os.path.exists(self.socket_path):
-            try:
-                os.remove(self.socket_path)
-            except Exception:
-                pass
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            pass
 
         log_path = str(pathlib.Path.home() / "mpv.log")
-        log_file = open(log_path, "w")
+        # Keep the previous run's log for post-mortems (mpv's --log-file truncates on open),
+        # and hand mpv an append-only, close-on-exec fd for stdout/stderr instead of a leaked
+        # truncating file object.
+        try:
+            if os.path.getsize(log_path) > 0:
+                os.replace(log_path, log_path + ".1")
+        except OSError:
+            pass
+        log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC, 0o644)
         base = [
             "mpv",
             f"--input-ipc-server={self.socket_path}",
@@ -298,7 +594,7 @@ class VideoController:
             "--force-window=no",
             "--keep-open=no",
             "--cache=no",
-            "--msg-level=all=v",
+            "--msg-level=all=info,ipc=v",  # ipc detail without verbose-everything on the SD card
             "--reset-on-next-file=all",
             "--osc=no",
             "--no-terminal",
@@ -313,7 +609,6 @@ class VideoController:
             "--scale=bilinear",
             "--dscale=bilinear",
             "--tscale=linear",
-            "--msg-level=ipc=v", 
             "--osd-level=0",
             "--osd-status-msg=",
             "--really-quiet",
@@ -327,21 +622,22 @@ class VideoController:
         if fullscreen:
             base.append("--fullscreen")
 
-        candidates = [
-            base,                # DRM + gpu (headless)
-            base + ["--vo=drm"], # simple DRM fallback
-        ]
-        if os.environ.get("DISPLAY"):
-            candidates.append(base + ["--vo=gpu"])
-        if os.environ.get("WAYLAND_DISPLAY"):
-            candidates.append(base + ["--vo=gpu"])
+        # base already says --vo=gpu, so the old DISPLAY/WAYLAND "--vo=gpu" entries were
+        # just base again; the plain-DRM fallback is only worth a try with a KMS device.
+        try:
+            has_drm = any(n.startswith("card") for n in os.listdir("/dev/dri"))
+        except OSError:
+            has_drm = False
+        candidates = [base]                        # DRM + gpu (headless)
+        if has_drm:
+            candidates.append(base + ["--vo=drm"]) # simple DRM fallback
 
         last_err = None
         for args in candidates:
             try:
-                self._proc = subprocess.Popen(args, stdout=log_file, stderr=log_file)
+                self._proc = subprocess.Popen(args, stdout=log_fd, stderr=log_fd)
                 self.mpv = MPVIPC(self.socket_path)
-                self.mpv.connect(timeout=20.0)
+                self.mpv.connect(timeout=20.0, proc=self._proc)
                 break
             except Exception as e:
                 last_err = e
@@ -353,9 +649,17 @@ class VideoController:
                     pass
                 self._proc = None
         else:
+            os.close(log_fd)
             raise RuntimeError(f"Failed to start mpv with any video output. See log: {log_path}") from last_err
+        os.close(log_fd)  # the child has its own copy
 
         self.mpv.on_event(self._on_mpv_event)
+        try:
+            # one write registers every mirrored property (ids are just labels for mpv)
+            self.mpv.send_many([["observe_property", i, name]
+                                for i, name in enumerate(_OBSERVED_PROPS, start=1)])
+        except Exception:
+            pass
         if self.main_path:
             self.play_main(self.main_path)
     
@@ -363,7 +667,6 @@ class VideoController:
     # ==== OSD TIMER ================================================
 
     def _ensure_osd_timer_state(self):
-        import threading, time  # safe if already imported
         if not hasattr(self, "_osd_timer_thread"): self._osd_timer_thread = None
         if not hasattr(self, "_osd_timer_stop"):   self._osd_timer_stop = threading.Event()
         if not hasattr(self, "_osd_timer_end"):    self._osd_timer_end = 0.0
@@ -380,16 +683,19 @@ class VideoController:
         if not hasattr(self, "_osd_timer_margin_y"):  self._osd_timer_margin_y = 40
         if not hasattr(self, "_osd_timer_paused"):      self._osd_timer_paused = threading.Event()
         if not hasattr(self, "_osd_timer_pause_left"):  self._osd_timer_pause_left = 0
+        if not hasattr(self, "_osd_ass_prefix"):        self._osd_ass_prefix = None
 
 
     def _osd_apply_anchor(self, anchor: int, margin_x: int = 40, margin_y: int = 40):
         row = {7:"top",8:"top",9:"top",4:"center",5:"center",6:"center",1:"bottom",2:"bottom",3:"bottom"}.get(anchor, "top")
         col = {7:"left",8:"center",9:"right",4:"left",5:"center",6:"right",1:"left",2:"center",3:"right"}.get(anchor, "center")
         try:
-            self.mpv.set_property("osd-align-x", col)
-            self.mpv.set_property("osd-align-y", row)
-            self.mpv.set_property("osd-margin-x", margin_x)
-            self.mpv.set_property("osd-margin-y", margin_y)
+            self.mpv.send_many([
+                ["set_property", "osd-align-x", col],
+                ["set_property", "osd-align-y", row],
+                ["set_property", "osd-margin-x", margin_x],
+                ["set_property", "osd-margin-y", margin_y],
+            ])
         except Exception:
             pass
 
@@ -400,25 +706,18 @@ class VideoController:
         return (f"{h:01d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}")
 
     def _osd_get_size(self):
-        try:
-            w = int(self.mpv.get_property("osd-width") or 1920)
-            h = int(self.mpv.get_property("osd-height") or 1080)
-        except Exception:
-            w, h = 1920, 1080
+        # kept current by observe_property; no IPC round trip per call
+        w, h = self._osd_size
         return w, h
 
-    def _osd_timer_ass(self, secs_left: int) -> str:
-        # text
-        timer = self._osd_timer_format(secs_left)
-
+    def _osd_timer_ass_prefix(self) -> str:
+        """Style/placement tags for the timer; fixed for the lifetime of one start_osd_timer call."""
         # style
         font_name = getattr(self, "_osd_timer_font_name", "DejaVu Sans").replace("{","").replace("}","")
         font_tag = ("\\fn" + font_name) if font_name else ""
         size_tag = "\\fs" + str(int(getattr(self, "_osd_timer_font", 72)))
         tc = getattr(self, "_osd_timer_text_color_ass", "&HFFFFFF&")
         oc = getattr(self, "_osd_timer_outline_color_ass", "&H000000&")
-        tc = getattr(self, "_osd_timer_text_color_ass", "&HFFFFFF&")
-        oc = getattr(self, "_osd_timer_outline_color_ass", "&H000000&")
         style_common = f"\\bord4\\1c{tc}\\3c{oc}\\fad(0,0)"
 
         # placement on a fixed virtual canvas
@@ -441,29 +740,23 @@ class VideoController:
             # anchor mode: put it near edges via margins on the fixed canvas
             mx = int(getattr(self, "_osd_timer_margin_x", 40))
             my = int(getattr(self, "_osd_timer_margin_y", 40))
-            # top row (7,8,9)
-            if anchor == 7: x_px,y_px = mx, my
-            elif anchor == 8: x_px,y_px = CANVAS_W//2 + mx, my
-            elif anchor == 9: x_px,y_px = CANVAS_W - mx, my
-            # middle row (4,5,6)
-            elif anchor == 4: x_px,y_px = mx, CANVAS_H//2 + my
-            elif anchor == 5: x_px,y_px = CANVAS_W//2 + mx, CANVAS_H//2 + my
-            elif anchor == 6: x_px,y_px = CANVAS_W - mx, CANVAS_H//2 + my
-            # bottom row (1,2,3)
-            elif anchor == 1: x_px,y_px = mx, CANVAS_H - my
-            elif anchor == 2: x_px,y_px = CANVAS_W//2 + mx, CANVAS_H - my
-            else:              x_px,y_px = CANVAS_W - mx, CANVAS_H - my
+            x_px, y_px = _anchor_xy(anchor, mx, my, CANVAS_W, CANVAS_H)
             pos_tag = f"\\pos({x_px},{y_px})"
 
         rot = int(getattr(self, "_osd_timer_rotation", 0))  # spin text only
-        return "{" + f"\\an{anchor}{font_tag}{size_tag}{style_common}{pos_tag}\\frz{rot}" + "}" + timer
+        return "{" + f"\\an{anchor}{font_tag}{size_tag}{style_common}{pos_tag}\\frz{rot}" + "}"
+
+    def _osd_timer_ass(self, secs_left: int) -> str:
+        prefix = getattr(self, "_osd_ass_prefix", None)
+        if prefix is None:
+            prefix = self._osd_timer_ass_prefix()
+        return prefix + self._osd_timer_format(secs_left)
 
 
     def _osd_timer_loop(self):
-        import time
         OVL_ID = 700
         CANVAS_W = CANVAS_H = 1000
-        last_ass = None
+        last_left = None
         TICK_S = 1.0
 
         while not self._osd_timer_stop.is_set():
@@ -473,14 +766,19 @@ class VideoController:
             else:
                 left = int(max(0, round(self._osd_timer_end - time.monotonic())))
 
-            ass = self._osd_timer_ass(left)
-            if ass != last_ass:
-                self._ovl_update(OVL_ID, ass, res_x=CANVAS_W, res_y=CANVAS_H, z=0)
-                last_ass = ass
+            # the prefix is fixed per run, so only a new second needs a redraw
+            if left != last_left:
+                self._ovl_update(OVL_ID, self._osd_timer_ass(left), res_x=CANVAS_W, res_y=CANVAS_H, z=0)
+                last_left = left
 
-            if (not getattr(self, "_osd_timer_paused", None) or not self._osd_timer_paused.is_set()) and left <= 0:
+            if getattr(self, "_osd_timer_paused", None) and self._osd_timer_paused.is_set():
+                self._osd_timer_stop.wait(TICK_S)
+                continue
+            if left <= 0:
                 break
-            self._osd_timer_stop.wait(TICK_S)
+            # sleep until the displayed second actually changes instead of drifting on a fixed 1 s tick
+            rem = self._osd_timer_end - time.monotonic()
+            self._osd_timer_stop.wait(min(TICK_S, max(0.0, rem - (left - 0.5)) + 0.005))
 
         # IMPORTANT: blank the overlay so the last value doesn’t stick
         self._ovl_update(OVL_ID, "", res_x=CANVAS_W, res_y=CANVAS_H, z=0)
@@ -492,7 +790,6 @@ class VideoController:
                         x: Optional[float] = None, y: Optional[float] = None,
                         margin_x: int = 40, margin_y: int = 40,
                         text_color: Optional[str] = None, outline_color: Optional[str] = None):
-        import threading, time
 
         self._ensure_osd_timer_state()
 
@@ -521,11 +818,11 @@ class VideoController:
 
         # Make sure OSD is visible during the timer
         try:
-            self._osd_prev_level = int(self.mpv.get_property("osd-level"))
+            self._osd_prev_level = self._get_osd_level()
         except Exception:
             self._osd_prev_level = None
         try:
-            self.mpv.set_property("osd-level", 1)
+            self._set_osd_level(1)
         except Exception:
             pass
 
@@ -555,14 +852,17 @@ class VideoController:
             self._osd_apply_anchor(self._osd_timer_anchor, self._osd_timer_margin_x, self._osd_timer_margin_y)
         else:
             try:
-                self.mpv.set_property("osd-align-x", "left")
-                self.mpv.set_property("osd-align-y", "top")
-                self.mpv.set_property("osd-margin-x", 0)
-                self.mpv.set_property("osd-margin-y", 0)
+                self.mpv.send_many([
+                    ["set_property", "osd-align-x", "left"],
+                    ["set_property", "osd-align-y", "top"],
+                    ["set_property", "osd-margin-x", 0],
+                    ["set_property", "osd-margin-y", 0],
+                ])
             except Exception:
                 pass
 
         # Arm fresh deadline and launch the loop
+        self._osd_ass_prefix = self._osd_timer_ass_prefix()
         self._osd_timer_stop.clear()
         self._osd_timer_end = time.monotonic() + max(0, int(seconds))
         self._osd_timer_thread = threading.Thread(target=self._osd_timer_loop, name="osd-timer", daemon=True)
@@ -571,7 +871,6 @@ class VideoController:
 
     def pause_osd_timer(self):
         """Freeze the countdown in place; keeps the overlay on screen."""
-        import time
         self._ensure_osd_timer_state()
         if self._osd_timer_thread and self._osd_timer_thread.is_alive():
             if not self._osd_timer_paused.is_set():
@@ -581,7 +880,6 @@ class VideoController:
 
     def resume_osd_timer(self):
         """Resume countdown from where it was paused."""
-        import time
         self._ensure_osd_timer_state()
         if self._osd_timer_paused.is_set():
             self._osd_timer_end = time.monotonic() + int(max(0, self._osd_timer_pause_left))
@@ -614,7 +912,7 @@ class VideoController:
         # restore osd-level if we raised it
         if getattr(self, "_osd_prev_level", None) is not None:
             try:
-                self.mpv.set_property("osd-level", int(self._osd_prev_level))
+                self._set_osd_level(int(self._osd_prev_level))
             except Exception:
                 pass
             self._osd_prev_level = None
@@ -623,21 +921,37 @@ class VideoController:
     # ==== /OSD TIMER =========================================================
 
     def _on_mpv_event(self, msg: dict):
-        if msg.get("event") == "file-loaded":
+        if msg.get("event") in ("start-file", "file-loaded"):
+            # --reset-on-next-file=all puts osd-level back to its startup value while the
+            # new file starts, so forget the shadow then (not at loadfile: a draw in between
+            # would re-cache a level mpv is about to reset).
+            self._osd_level = None
+
+        if msg.get("event") == "property-change":
+            name = msg.get("name")
             try:
-                # Apply loop mode
-                self.mpv.set_property(
-                    "loop-file",
-                    "inf" if self._loop_for_next_file else "no"
-                )
-
-                # Arm interrupt if this was the interrupt file
-                try:
-                    cur_path = self.mpv.get_property("path") or self.mpv.get_property("filename")
-                except Exception:
-                    cur_path = None
+                if name == "video-rotate":
+                    self._video_rotate = int(msg.get("data") or 0) % 360
+                elif name == "osd-width":
+                    self._osd_size[0] = int(msg.get("data") or 1920)
+                elif name == "osd-height":
+                    self._osd_size[1] = int(msg.get("data") or 1080)
+            except (TypeError, ValueError):
+                pass
+            return
 
+        if msg.get("event") == "file-loaded":
+            self._file_loaded_evt.set()
+            # Apply loop mode (sent with the rest of the batch below, whatever happens in between)
+            cmds = [["set_property", "loop-file", "inf" if self._loop_for_next_file else "no"]]
+            try:
+                # Arm interrupt if this was the interrupt file (only then is the path worth a query)
                 if self._pending_interrupt_path:
+                    try:
+                        path, fname = self.mpv.get_properties("path", "filename")
+                        cur_path = path or fname
+                    except Exception:
+                        cur_path = None
                     want = self._pending_interrupt_path
                     if cur_path and (
                         str(cur_path) == want or
@@ -649,15 +963,18 @@ class VideoController:
 
                 # Restore persistent volume after interrupt resumes
                 if self.persistent_volume is not None:
-                    self.mpv.set_property("volume", self.persistent_volume)
+                    cmds.append(["set_property", "volume", self.persistent_volume])
                 elif hasattr(self, "_restore_volume_after_resume"):
                     if self._restore_volume_after_resume is not None:
-                        self.mpv.set_property("volume", self._restore_volume_after_resume)
+                        cmds.append(["set_property", "volume", self._restore_volume_after_resume])
 
                     del self._restore_volume_after_resume
+            except Exception:
+                pass
 
-                self.mpv.set_property("pause", False)
-
+            cmds.append(["set_property", "pause", False])
+            try:
+                self.mpv.send_many(cmds)
             except Exception:
                 pass
 
@@ -680,7 +997,11 @@ class VideoController:
 
 
     def _play_file(self, path: str, loop: bool, start: Optional[float] = None):
-        abs_path = os.path.abspath(path)
+        abs_path = _abspath(path)
+        # a new file/seek: don't serve the old position, nor let a query already in
+        # flight store it back
+        self._time_gen = next(self._time_gens)
+        self._time_cache = (-1.0, 0.0)
 
         # Allow http(s), otherwise require local file
         if not (abs_path.startswith("http://") or abs_path.startswith("https://")):
@@ -691,36 +1012,26 @@ class VideoController:
 
         # Issue loadfile with no per-file options (max compatibility)
         # NOTE: do not append "start=..." here (breaks on some mpv builds)
-        self.mpv.command("loadfile", abs_path, "replace")
-
-        # Apply per-file behavior AFTER load (so it can't be reset by the load)
-        try:
-            self.mpv.set_property("loop-file", "inf" if loop else "no")
-        except Exception:
-            pass
-
-        # If a start offset is requested, do a precise seek
+        # Per-file behavior goes AFTER the load (so it can't be reset by it); mpv runs
+        # the lines in order, so the whole sequence goes out in one write.
+        cmds = [
+            ["loadfile", abs_path, "replace"],
+            ["set_property", "loop-file", "inf" if loop else "no"],
+        ]
+        # If a start offset is requested, do a precise seek (absolute+exact)
         if start is not None:
-            try:
-                # absolute+exact: go to timestamp immediately
-                self.mpv.command("seek", f"{float(start):.3f}", "absolute+exact")
-            except Exception:
-                pass
-
+            cmds.append(["seek", f"{float(start):.3f}", "absolute+exact"])
         # Make sure we’re playing
-        try:
-            self.mpv.set_property("pause", False)
-        except Exception:
-            pass
+        cmds.append(["set_property", "pause", False])
+        self._file_loaded_evt.clear()
+        self.mpv.send_many(cmds)
 
         # Verify the switch quickly (no sleeping for ages)
         def switched_enough() -> Tuple[bool, dict]:
             state = {"path": None, "filename": None, "playlist_name": None, "time_pos": None}
             try:
-                cur_path = self.mpv.get_property("path")
-                cur_fname = self.mpv.get_property("filename")
-                playlist  = self.mpv.get_property("playlist")
-                tpos      = self.mpv.get_property("time-pos")
+                cur_path, cur_fname, playlist, tpos = self.mpv.get_properties(
+                    "path", "filename", "playlist", "time-pos")
             except Exception:
                 cur_path = cur_fname = playlist = tpos = None
 
@@ -741,12 +1052,20 @@ class VideoController:
                         return True, state
             return False, state
 
+        # Normally mpv's file-loaded event says when to look, so one check suffices. Listeners
+        # (e.g. the end-file resume) run on the event thread and can't see that event while
+        # they're still in here, so they, and a check that fails, fall back to polling.
+        deadline = time.monotonic() + 2.0
+        if not self.mpv.in_event_thread():
+            self._file_loaded_evt.wait(2.0)
         last_state = {}
-        for _ in range(20):  # ~2s total
+        while True:
             ok, state = switched_enough()
             last_state = state
             if ok:
                 return
+            if time.monotonic() >= deadline:
+                break
             time.sleep(0.1)
 
         ctx = {
@@ -761,7 +1080,7 @@ class VideoController:
 
 
     def play_main(self, path: str):
-        self.main_path = os.path.abspath(path)
+        self.main_path = _abspath(path)
         self._loop_for_next_file = True
 
         # 1. Pause BEFORE loadfile to prevent audio burst
@@ -774,15 +1093,13 @@ class VideoController:
         self._play_file(self.main_path, loop=True, start=None)
 
         # 3. Apply persistent volume BEFORE playback resumes
+        # 4. Resume with correct volume already set (mpv runs the lines in order, one write)
+        cmds = []
         if self.persistent_volume is not None:
-            try:
-                self.mpv.set_property("volume", self.persistent_volume)
-            except Exception:
-                pass
-
-        # 4. Resume with correct volume already set
+            cmds.append(["set_property", "volume", self.persistent_volume])
+        cmds.append(["set_property", "pause", False])
         try:
-            self.mpv.set_property("pause", False)
+            self.mpv.send_many(cmds)
         except Exception:
             pass
 
@@ -795,6 +1112,22 @@ class VideoController:
         except Exception:
             return 0.0
 
+    def get_time_cached(self, max_age: float = STATUS_TIME_TTL_S) -> float:
+        """time-pos for pollers: reuse a reading younger than max_age, and let concurrent
+        callers wait for the one query in flight rather than each sending their own."""
+        stamp, t = self._time_cache
+        if time.monotonic() - stamp < max_age:
+            return t
+        with self._time_lock:
+            stamp, t = self._time_cache
+            if time.monotonic() - stamp < max_age:
+                return t  # refreshed by whoever held the lock
+            gen = self._time_gen
+            t = self.get_time()
+            if self._time_gen == gen:
+                self._time_cache = (time.monotonic(), t)
+            return t
+
     def interrupt(self, path: str, mode: str, vol: int = 100):
         if not self.main_path:
             raise RuntimeError("Main video is not playing yet.")
@@ -802,19 +1135,23 @@ class VideoController:
         # Clamp volume
         interrupt_volume = max(0, min(100, int(vol)))
 
-        # Save current playback position
-        self.saved_pos = self.get_time()
+        # Save current playback position (and volume, in the same round trip)
+        t, cur_vol = self.mpv.get_properties("time-pos", "volume")
+        try:
+            self.saved_pos = float(t)
+        except Exception:
+            self.saved_pos = 0.0
         self.interrupt_mode = mode
 
         # Save current volume only if persistent not being used
         if self.persistent_volume is None:
-            self._saved_volume = self.mpv.get_property("volume") or 100
+            self._saved_volume = cur_vol or 100
         else:
             self._saved_volume = self.persistent_volume
 
 
         self._loop_for_next_file = False
-        self._pending_interrupt_path = os.path.abspath(path)
+        self._pending_interrupt_path = _abspath(path)
 
         self._play_file(path, loop=False, start=None)
 
@@ -823,7 +1160,6 @@ class VideoController:
     def overlay_text(self, text: str, font: Optional[str], size: Optional[int],
                      align: str, margin_x: int, margin_y: int, duration_ms: int,
                      rotate_deg: int = 0):
-        import threading
 
         # Single overlay id for these toasts; create attrs if they don't exist
         if not hasattr(self, "_toast_ovl_id"):
@@ -834,66 +1170,30 @@ class VideoController:
         OVL_ID = self._toast_ovl_id
         RES_W = RES_H = 1000   # simple, fixed canvas; margins are in these pixels
 
+        # "Hide toast" cue: nothing to lay out, show or time. Any earlier toast's
+        # blank timer stays armed so it still restores osd-level when it fires.
+        if not str(text or "").strip() or int(duration_ms) <= 0:
+            self._toast_draw("")
+            return
+
         # Remember current OSD level, bump to 1 so text is visible
         try:
-            prev_level = int(self.mpv.get_property("osd-level"))
+            prev_level = self._get_osd_level()
         except Exception:
             prev_level = None
         try:
-            self.mpv.set_property("osd-level", 1)
+            self._set_osd_level(1)
         except Exception:
             pass
 
-        # Map align → ASS \an and simple anchor->(x,y) on a 1000×1000 canvas
-        an_map = {
-            "top-left":7, "top-center":8, "top-right":9,
-            "center-left":4, "center":5, "center-right":6,
-            "bottom-left":1, "bottom-center":2, "bottom-right":3,
-        }
-        a = an_map.get(align, 8)
-
-        mx, my = int(margin_x), int(margin_y)
-        if   a == 7: x_px, y_px = mx, my
-        elif a == 8: x_px, y_px = RES_W//2 + mx, my
-        elif a == 9: x_px, y_px = RES_W - mx, my
-        elif a == 4: x_px, y_px = mx, RES_H//2 + my
-        elif a == 5: x_px, y_px = RES_W//2 + mx, RES_H//2 + my
-        elif a == 6: x_px, y_px = RES_W - mx, RES_H//2 + my
-        elif a == 1: x_px, y_px = mx, RES_H - my
-        elif a == 2: x_px, y_px = RES_W//2 + mx, RES_H - my
-        else:        x_px, y_px = RES_W - mx, RES_H - my
-
-        # Fixed-length, word-boundary wrapping
-        wrap_chars = globals().get("TOAST_WRAP_CHARS", 40)
-        def _wrap_words(s: str, maxc: int) -> str:
-            words = (s or "").split()
-            if not words:
-                return ""
-            lines, line = [], words[0]
-            for w in words[1:]:
-                if len(line) + 1 + len(w) <= maxc:
-                    line += " " + w
-                else:
-                    lines.append(line)
-                    line = w
-            lines.append(line)
-            return "\\N".join(lines)
-
-        wrapped = _wrap_words(str(text), int(wrap_chars))
-
-        # Minimal ASS: font, size, outline, rotation, explicit position
-        font_tag = f"\\fn{font}" if font else ""
-        size_tag = f"\\fs{int(size)}" if size is not None else ""
-        rot_tag  = f"\\frz{int(rotate_deg)}" if int(rotate_deg) else ""
-        style    = "\\bord3\\1c&HFFFFFF&\\3c&H000000&"  # white with black outline
-        ass = "{" + f"\\an{a}{font_tag}{size_tag}{style}\\pos({x_px},{y_px}){rot_tag}" + "}" + wrapped
+        # Map align → ASS \an; placement on a 1000×1000 canvas (cues repeat, so the
+        # wrapped/styled string comes out of a small cache)
+        ass = _build_toast_ass(str(text), font, None if size is None else int(size),
+                               _TOAST_ALIGN.get(align, 8), int(margin_x), int(margin_y),
+                               int(rotate_deg), int(globals().get("TOAST_WRAP_CHARS", 40)))
 
         # Draw (no “remove”; we’ll blank it later)
-        try:
-            # your helper must be: mpv.command("osd-overlay", str(id), "ass-events", ass, str(res_x), str(res_y), str(z))
-            self._ovl_update(OVL_ID, ass, res_x=RES_W, res_y=RES_H, z=0)
-        except Exception:
-            pass
+        self._toast_draw(ass)
 
         # Cancel any previous clear timer, then schedule a simple "blank" draw
         try:
@@ -903,11 +1203,9 @@ class VideoController:
             pass
 
         def _blank():
-            try:
-                # print an empty message to the SAME overlay id
-                self._ovl_update(OVL_ID, "", res_x=RES_W, res_y=RES_H, z=0)
-            except Exception:
-                pass
+            # print an empty message to the SAME overlay id (through the same
+            # coalescing path, so it can't be overtaken by a still-pending draw)
+            self._toast_draw("")
             # restore osd-level if the main timer isn't running
             try:
                 active = bool(self._osd_timer_thread and self._osd_timer_thread.is_alive())
@@ -915,15 +1213,26 @@ class VideoController:
                 active = False
             if not active and prev_level is not None:
                 try:
-                    self.mpv.set_property("osd-level", prev_level)
+                    self._set_osd_level(prev_level)
                 except Exception:
                     pass
 
-        import threading
-        t = threading.Timer(max(0, int(duration_ms)) / 1000.0, _blank)
-        t.daemon = True
-        self._toast_timer = t
-        t.start()
+        self._toast_timer = self._timers.call_later(max(0, int(duration_ms)) / 1000.0, _blank)
+
+
+    def _toast_draw(self, ass: str):
+        """Queue a toast frame; bursts within TOAST_COALESCE_S become one osd-overlay command."""
+        with self._toast_lock:
+            self._toast_pending = ass
+            if self._toast_flush is None:
+                self._toast_flush = self._timers.call_later(TOAST_COALESCE_S, self._toast_flush_now)
+
+    def _toast_flush_now(self):
+        with self._toast_lock:
+            ass, self._toast_pending = self._toast_pending, None
+            self._toast_flush = None
+        if ass is not None:
+            self._ovl_update(getattr(self, "_toast_ovl_id", 702), ass, res_x=1000, res_y=1000, z=0)
 
 
     # Rotatable OSD message (independent of the timer overlay)
@@ -935,35 +1244,23 @@ class VideoController:
                          duration_ms: int = 1500,
                          margin_x: int = 40,
                          margin_y: int = 40):
-        import threading
 
         OVL_ID = int(getattr(self, "_msg_ovl_id", 701))
         CANVAS_W = CANVAS_H = 1000
 
         # Build ASS: style + rotation + position from anchor/margins
-        font_tag = f"\\fn{font}" if font else ""
         tc = getattr(self, "_osd_timer_text_color_ass", "&HFFFFFF&")
         oc = getattr(self, "_osd_timer_outline_color_ass", "&H000000&")
-        style_common = "\\bord4\\1c" + tc + "\\3c" + oc + "\\fad(0,0)"
-        a = int(anchor); mx = int(margin_x); my = int(margin_y)
-        if   a == 7: x_px, y_px = mx, my
-        elif a == 8: x_px, y_px = CANVAS_W//2 + mx, my
-        elif a == 9: x_px, y_px = CANVAS_W - mx, my
-        elif a == 4: x_px, y_px = mx, CANVAS_H//2 + my
-        elif a == 5: x_px, y_px = CANVAS_W//2 + mx, CANVAS_H//2 + my
-        elif a == 6: x_px, y_px = CANVAS_W - mx, CANVAS_H//2 + my
-        elif a == 1: x_px, y_px = mx, CANVAS_H - my
-        elif a == 2: x_px, y_px = CANVAS_W//2 + mx, CANVAS_H - my
-        else:        x_px, y_px = CANVAS_W - mx, CANVAS_H - my
-        ass = "{" + f"\\an{a}{font_tag}\\fs{int(font_size)}{style_common}\\pos({x_px},{y_px})\\frz{int(rotate_deg)}" + "}" + str(text)
+        ass = _build_msg_ass(str(text), font, int(font_size), int(anchor), int(margin_x), int(margin_y),
+                             int(rotate_deg), tc, oc)
 
         # Ensure OSD is visible for the toast (remember previous level to restore later)
         try:
-            prev_level = int(self.mpv.get_property("osd-level"))
+            prev_level = self._get_osd_level()
         except Exception:
             prev_level = None
         try:
-            self.mpv.set_property("osd-level", 1)
+            self._set_osd_level(1)
         except Exception:
             pass
 
@@ -995,30 +1292,50 @@ class VideoController:
                 pass
             if not active and prev_level is not None:
                 try:
-                    self.mpv.set_property("osd-level", prev_level)
+                    self._set_osd_level(prev_level)
                 except Exception:
                     pass
 
-        t = threading.Timer(max(0, int(duration_ms)) / 1000.0, _remove)
-        t.daemon = True
-        self._msg_remove_timer = t
-        t.start()
+        self._msg_remove_timer = self._timers.call_later(max(0, int(duration_ms)) / 1000.0, _remove)
 
 
 
 # ======== HTTP API ========
 
-app = FastAPI()
+_JSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+@contextlib.asynccontextmanager
+async def _lifespan(app):
+    yield
+    _shutdown()  # defined with the routes below; runs once uvicorn stops serving
+
+
+app = FastAPI(default_response_class=_JSONResponse, lifespan=_lifespan)
 _controller: Optional[VideoController] = None
 _controller_lock = threading.Lock()
+# Overlay/message draws don't touch playback state (main_path, interrupt_*), so they
+# serialise among themselves only and never queue behind a /play or /interrupt wait.
+_overlay_lock = threading.Lock()
 
 
 SERVICE_NAME = "video"
 
+@functools.lru_cache(maxsize=64)
+def _ok_body(action: str, message: str) -> bytes:
+    # same bytes JSONResponse would render for api_ok(action, message)
+    payload = {"ok": True, "service": SERVICE_NAME, "action": action, "message": message}
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
 def api_ok(action: str, message: str = "ok", **extra):
+    if not extra:
+        # fixed acknowledgements (timer/overlay/message routes): serialised once, not per request
+        return Response(content=_ok_body(action, message), media_type="application/json")
     payload = {"ok": True, "service": SERVICE_NAME, "action": action, "message": message}
     payload.update(extra)
-    return payload
+    # extras are plain str/int/float/bool/None: render directly and skip FastAPI's
+    # jsonable_encoder walk (this is the /status poll path)
+    return _JSONResponse(payload)
 
 
 def _error_payload(message: str, path: str, error_code: str, **extra):
@@ -1076,8 +1393,21 @@ def _tail_mpv_log(lines: int = 60) -> str:
     if not p.exists():
         return "(mpv.log not found)"
     try:
+        # Read backwards in blocks until we hold more than `lines` newlines; the log can be
+        # many MB and only its end is wanted.
         with p.open("rb") as f:
-            data = f.read()
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            blocks = []
+            nl = 0
+            while pos > 0 and (lines <= 0 or nl <= lines):
+                step = min(8192, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step)
+                blocks.append(chunk)
+                nl += chunk.count(b"\n")
+        data = b"".join(reversed(blocks))
         tail = b"\n".join(data.splitlines()[-lines:])
         return tail.decode("utf-8", errors="replace")
     except Exception as e:
@@ -1129,7 +1459,7 @@ class MessageBody(BaseModel):
 
 @app.post("/message")
 def osd_message(body: MessageBody):
-    with _controller_lock:
+    with _overlay_lock:
         if not _controller:
             raise HTTPException(500, "Controller not initialized")
         _controller.show_osd_message(
@@ -1158,11 +1488,13 @@ def play_main(body: PlayBody):
 
 @app.get("/status")
 def status():
-    with _controller_lock:
-        if not _controller:
-            raise HTTPException(500, "Controller not initialized")
-        t = _controller.get_time()
-        return api_ok("status", "video status fetched", main=_controller.main_path, time_pos=t, interrupt_active=_controller.interrupt_active, interrupt_mode=_controller.interrupt_mode)
+    # Read-only: don't queue behind a /play or /interrupt holding the lock through its
+    # file-switch wait. MPVIPC demuxes replies per request, so a concurrent query is safe.
+    ctrl = _controller
+    if not ctrl:
+        raise HTTPException(500, "Controller not initialized")
+    t = ctrl.get_time_cached()
+    return api_ok("status", "video status fetched", main=ctrl.main_path, time_pos=t, interrupt_active=ctrl.interrupt_active, interrupt_mode=ctrl.interrupt_mode)
 
 @app.post("/interrupt/return")
 def interrupt_return(body: InterruptBody):
@@ -1205,7 +1537,7 @@ def interrupt_skip(body: InterruptBody):
 @app.post("/overlay")
 def overlay(body: OverlayBody):
     try:
-        with _controller_lock:
+        with _overlay_lock:
             if not _controller:
                 raise RuntimeError("Controller not initialized")
             _controller.overlay_text(
@@ -1278,6 +1610,16 @@ def osd_timer_resume():
     return api_ok("timer_resume", "timer resumed")
 
 
+def _call_locked(lock, name: str, *args, **kwargs):
+    # The async routes below only need the event loop to read the body; the controller
+    # call blocks on mpv IPC (a file switch waits for file-loaded), so it runs here,
+    # in the threadpool, instead of stalling every other request.
+    with lock:
+        if not _controller:
+            raise HTTPException(500, "Controller not initialized")
+        return getattr(_controller, name)(*args, **kwargs)
+
+
 # ---------- OVERLAY (headerless) ----------
 @app.get("/cogs/overlay")
 def cogs_overlay_get(
@@ -1290,7 +1632,7 @@ def cogs_overlay_get(
     duration_ms: int = 2000,
     rotate_deg: int = 0,
 ):
-    with _controller_lock:
+    with _overlay_lock:
         _controller.overlay_text(
             text=text, font=font, size=size, align=align,
             margin_x=margin_x, margin_y=margin_y,
@@ -1303,17 +1645,17 @@ async def cogs_overlay_post(request: Request):
     d = await _parse_noheader_body(request)
     if not d.get("text"):
         raise HTTPException(400, "missing 'text'")
-    with _controller_lock:
-        _controller.overlay_text(
-            text=str(d.get("text","")),
-            font=d.get("font"),
-            size=int(d["size"]) if d.get("size") not in (None, "") else None,
-            align=str(d.get("align","top-center")),
-            margin_x=int(d.get("margin_x", 40)),
-            margin_y=int(d.get("margin_y", 40)),
-            duration_ms=int(d.get("duration_ms", 2000)),
-            rotate_deg=int(d.get("rotate_deg", 0)),
-        )
+    await run_in_threadpool(
+        _call_locked, _overlay_lock, "overlay_text",
+        text=str(d.get("text","")),
+        font=d.get("font"),
+        size=int(d["size"]) if d.get("size") not in (None, "") else None,
+        align=str(d.get("align","top-center")),
+        margin_x=int(d.get("margin_x", 40)),
+        margin_y=int(d.get("margin_y", 40)),
+        duration_ms=int(d.get("duration_ms", 2000)),
+        rotate_deg=int(d.get("rotate_deg", 0)),
+    )
     return api_ok("cogs_overlay", "overlay shown")
 
 
@@ -1344,24 +1686,24 @@ def cogs_timer_osd_start_get(
 @app.post("/cogs/timer/osd/start")
 async def cogs_timer_osd_start_post(request: Request):
     d = await _parse_noheader_body(request)
-    with _controller_lock:
-        try:
-            _controller.start_osd_timer(
-                int(d.get("seconds", 0)),
-                int(d.get("rotation", 180)),
-                int(d.get("anchor", 9)),
-                int(d.get("font_size", 72)),
-                d.get("font"),
-                str(d.get("position_mode", "anchor")),
-                float(d["x"]) if d.get("x") not in (None, "") else None,
-                float(d["y"]) if d.get("y") not in (None, "") else None,
-                int(d.get("margin_x", 40)),
-                int(d.get("margin_y", 40)),
-                d.get("text_color"),
-                d.get("outline_color"),
-            )
-        except ValueError as e:
-            raise HTTPException(400, str(e))
+    try:
+        await run_in_threadpool(
+            _call_locked, _controller_lock, "start_osd_timer",
+            int(d.get("seconds", 0)),
+            int(d.get("rotation", 180)),
+            int(d.get("anchor", 9)),
+            int(d.get("font_size", 72)),
+            d.get("font"),
+            str(d.get("position_mode", "anchor")),
+            float(d["x"]) if d.get("x") not in (None, "") else None,
+            float(d["y"]) if d.get("y") not in (None, "") else None,
+            int(d.get("margin_x", 40)),
+            int(d.get("margin_y", 40)),
+            d.get("text_color"),
+            d.get("outline_color"),
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     return api_ok("cogs_timer_start", "timer started")
 
 @app.get("/cogs/timer/osd/pause")
@@ -1409,10 +1751,7 @@ async def cogs_interrupt_return_post(request: Request):
 
     vol = int(d.get("vol", 100))
 
-    with _controller_lock:
-        if not _controller:
-            raise HTTPException(500, "Controller not initialized")
-        _controller.interrupt(str(d["path"]), "return", vol)
+    await run_in_threadpool(_call_locked, _controller_lock, "interrupt", str(d["path"]), "return", vol)
 
     return api_ok("cogs_interrupt_return", "interrupt started", path=str(d["path"]), vol=vol, mode="return")
 
@@ -1425,10 +1764,7 @@ async def cogs_interrupt_skip_post(request: Request):
 
     vol = int(d.get("vol", 100))
 
-    with _controller_lock:
-        if not _controller:
-            raise HTTPException(500, "Controller not initialized")
-        _controller.interrupt(str(d["path"]), "skip", vol)
+    await run_in_threadpool(_call_locked, _controller_lock, "interrupt", str(d["path"]), "skip", vol)
 
     return api_ok("cogs_interrupt_skip", "interrupt started", path=str(d["path"]), vol=vol, mode="skip")
 
@@ -1447,40 +1783,42 @@ async def cogs_play_post(request: Request):
     d = await _parse_noheader_body(request)  # accepts path in body or query
     if not d.get("path"):
         raise HTTPException(400, "missing 'path'")
-    with _controller_lock:
-        if not _controller:
-            raise HTTPException(500, "Controller not initialized")
-        _controller.play_main(str(d["path"]))
+    await run_in_threadpool(_call_locked, _controller_lock, "play_main", str(d["path"]))
     return api_ok("cogs_play", "main video started", path=str(d["path"]))
 
 
 from urllib.parse import unquote_plus
 
+# Path-message tokens, decoded in one scan. "~p" is matched before "~pl" (so "~pl" reads
+# as "%l"), which is what the old replace chain did.
+_OVERLAYP_TOKENS = {"%20": " ", "_": " ", "~a": "&", "~q": "?", "~h": "#", "~p": "%", "~dq": "\""}
+_OVERLAYP_RE = re.compile(r"%20|_|~a|~q|~h|~p|~dq")
+
+def _overlayp_sub(m):
+    return _OVERLAYP_TOKENS[m.group(0)]
+
 # /cogs/overlayp/<rotate>/<align>/<mx>/<my>/<size>/<font>/<duration_ms>/<message...>
 @app.get("/cogs/overlayp/{rotate_deg}/{align}/{margin_x}/{margin_y}/{size}/{font}/{duration_ms}/{raw:path}")
 def cogs_overlay_path(rotate_deg: int, align: str, margin_x: int, margin_y: int,
                       size: int, font: str, duration_ms: int, raw: str):
     # Decode message + font safely (accept %20, +, _, and our tiny tokens)
-    msg = unquote_plus(raw or "")
-    msg = (msg.replace("%20", " ").replace("_", " ")
-              .replace("~a","&").replace("~q","?").replace("~h","#")
-              .replace("~p","%").replace("~pl","+").replace("~dq","\""))
+    msg = _OVERLAYP_RE.sub(_overlayp_sub, unquote_plus(raw or ""))
 
     fnt = unquote_plus(font or "")
     fnt = fnt.replace("%20", " ").replace("_", " ")
     if fnt in ("-", "none", ""):  # allow "no font" via "-", "none", or empty
         fnt = None
 
-    with _controller_lock:
+    with _overlay_lock:
         _controller.overlay_text(
             text=msg,
             font=fnt,
-            size=int(size),
+            size=size,
             align=align,
-            margin_x=int(margin_x),
-            margin_y=int(margin_y),
-            duration_ms=int(duration_ms),
-            rotate_deg=int(rotate_deg),
+            margin_x=margin_x,
+            margin_y=margin_y,
+            duration_ms=duration_ms,
+            rotate_deg=rotate_deg,
         )
     return api_ok("cogs_overlay_path", "overlay shown")
 
@@ -1491,7 +1829,7 @@ def cogs_set_volume(level: int):
         if not _controller:
             raise HTTPException(500, "Controller not initialized")
 
-        vol = max(0, min(100, int(level)))
+        vol = max(0, min(100, level))
 
         # Store persistent volume
         _controller.persistent_volume = vol
@@ -1506,6 +1844,21 @@ def cogs_set_volume(level: int):
 
 
 
+def _shutdown():
+    # stop the countdown thread and release the IPC socket before the process goes away
+    with _controller_lock:
+        if not _controller:
+            return
+        try:
+            _controller.stop_osd_timer()
+        except Exception:
+            pass
+        try:
+            _controller.mpv.close()
+        except Exception:
+            pass
+
+
 # ======== Entrypoint ========
 
 def parse_args():
@@ -1520,5 +1873,6 @@ if __name__ == "__main__":
     args = parse_args()
     _controller = VideoController(main_path=args.main, fullscreen=args.fullscreen)
     import uvicorn
-    uvicorn.run(app, host=args.host, port=args.port)
+    # loop/http "auto" pick uvloop + httptools when uvicorn[standard] is installed (setup script does)
+    uvicorn.run(app, host=args.host, port=args.port, loop="auto", http="auto", lifespan="on")
 